@@ -0,0 +1 @@
+"""benchmarks, run from the root of the project, see README.md"""
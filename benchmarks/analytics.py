@@ -0,0 +1,135 @@
+"""
+Guild and user usage summaries counted by Mongo aggregations, against
+loading the usage data into a list and counting it in Python as before, on
+a local mongod seeded with millions of entries (skipped without one, see
+mongo.py).
+
+    python -m benchmarks.analytics [--rows 2000000] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict
+from benchmarks import mongo
+from benchmarks.common import percentile
+from tiktoker.db.models import UsageData
+from tiktoker.utils import get_guild_usage_data, get_user_usage_data
+from tiktoker.utils.analytics import get_guild_usage_summary, get_user_usage_summary
+
+BIG_GUILD = 1
+"""Gets a tenth of the usage data, the other guilds share the rest"""
+SEED_BATCH = 10000
+
+
+async def seed(rows: int) -> None:
+    generator = random.Random(0)
+    now = datetime.utcnow()
+    collection = UsageData.get_motor_collection()
+    for start in range(0, rows, SEED_BATCH):
+        await collection.insert_many(
+            [
+                {
+                    "guild_id": (
+                        BIG_GUILD
+                        if generator.random() < 0.1
+                        else generator.randint(2, 10000)
+                    ),
+                    "user_id": (
+                        None
+                        if generator.random() < 0.05
+                        else generator.randint(1, 200000)
+                    ),
+                    "video_id": 7068971038273423621
+                    + int(generator.paretovariate(1.2)) % 50000,
+                    "message_id": generator.getrandbits(62),
+                    "entry_time": now
+                    - timedelta(seconds=generator.randint(0, 90 * 24 * 60 * 60)),
+                }
+                for _ in range(min(SEED_BATCH, rows - start))
+            ],
+            ordered=False,
+        )
+
+
+def summarize_list(usage_data: list, days: int = 30, top: int = 5) -> Dict[str, Any]:
+    """What consumers of the usage data lists counted."""
+    since = datetime.utcnow() - timedelta(days=days)
+    daily = Counter(
+        entry.entry_time.strftime("%Y-%m-%d")
+        for entry in usage_data
+        if entry.entry_time >= since
+    )
+    return {
+        "total": len(usage_data),
+        "unique_users": len({entry.user_id for entry in usage_data if entry.user_id}),
+        "daily": sorted(daily.items()),
+        "top_videos": Counter(entry.video_id for entry in usage_data).most_common(top),
+    }
+
+
+async def time_it(repeat: int, func: Callable[[], Awaitable[Any]]) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = perf_counter()
+        await func()
+        samples.append(perf_counter() - started)
+    return percentile(samples, 50)
+
+
+async def run(args: argparse.Namespace) -> None:
+    if (database := await mongo.connect()) is None:
+        return
+    try:
+        started = perf_counter()
+        await seed(args.rows)
+        print(f"seeded {args.rows:,} entries in {perf_counter() - started:.1f}s")
+
+        small_guild = (
+            await UsageData.find_one({"guild_id": {"$ne": BIG_GUILD}})
+        ).guild_id
+        user_id = (await UsageData.find_one({"user_id": {"$ne": None}})).user_id
+        for name, load, summarize in [
+            (
+                f"big guild {BIG_GUILD}",
+                lambda: get_guild_usage_data(BIG_GUILD),
+                lambda: get_guild_usage_summary(BIG_GUILD),
+            ),
+            (
+                f"small guild {small_guild}",
+                lambda: get_guild_usage_data(small_guild),
+                lambda: get_guild_usage_summary(small_guild),
+            ),
+            (
+                f"user {user_id}",
+                lambda: get_user_usage_data(user_id),
+                lambda: get_user_usage_summary(user_id),
+            ),
+        ]:
+
+            async def load_and_count():
+                return summarize_list(await load())
+
+            before = await time_it(args.repeat, load_and_count)
+            after = await time_it(args.repeat, summarize)
+            print(
+                f"{name}: list {before * 1000:.1f}ms, aggregation {after * 1000:.1f}ms"
+                f" ({before / after:.1f}x)"
+            )
+    finally:
+        await mongo.drop(database)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+End-to-end latency of the auto embed listener (TikTok.on_message_create),
+against the serial order it ran in before: config, typing, video id,
+get_tiktok, short url, suppress embeds, fetch_channel, reply, usage.
+
+Discord and the database are stubbed with sleeps of about their latency,
+get_tiktok requests a local stand-in for api2.musical.ly. Every message has
+a new video, so none is served from the cache. The time until the reply is
+sent is what the user waits for, the waterfall shows when every stage ran.
+
+    python -m benchmarks.auto_embed [--messages 100] [--discord-latency 50]
+"""
+
+import argparse
+import asyncio
+import random
+from collections import defaultdict
+from itertools import count
+from time import perf_counter
+from types import MethodType, SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from aiohttp import web
+from benchmarks import stand_in
+from benchmarks.common import percentile, report
+from benchmarks.payloads import load_responses
+from tiktoker.scales import tiktok
+from tiktoker.utils import drain_background_tasks, http
+
+VIDEO_IDS = count(7068971038273423621)
+STAGES = [
+    "config",
+    "typing",
+    "video id",
+    "get_tiktok",
+    "short url",
+    "suppress embeds",
+    "fetch_channel",
+    "reply",
+    "usage",
+]
+
+STUBBED = [
+    "get_guild_config",
+    "create_short_url",
+    "insert_usage_data",
+    "get_tiktok",
+    "get_video_id",
+]
+"""What `stub` replaces in the scale's module"""
+
+
+class Waterfall:
+    """When every stage of the message being handled started and ended."""
+
+    def __init__(self):
+        self.started = 0.0
+        self.stages: Dict[str, List[Tuple[float, float]]] = defaultdict(list)
+
+    def reset(self) -> None:
+        self.started = perf_counter()
+
+    def stage(
+        self, name: str, func: Callable[..., Awaitable[Any]]
+    ) -> Callable[..., Awaitable[Any]]:
+        """Wraps a coroutine function, recording it as the stage `name`."""
+
+        async def timed(*args, **kwargs):
+            started = perf_counter() - self.started
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                ended = perf_counter() - self.started
+                self.stages[name].append((started, ended))
+
+        return timed
+
+    def report(self, name: str) -> None:
+        print(f"{name}, waterfall (p50 start -> end):")
+        for stage in STAGES:
+            if timings := self.stages.get(stage):
+                start = percentile([started for started, _ in timings], 50)
+                end = percentile([ended for _, ended in timings], 50)
+                print(f"  {stage:<16} {start * 1000:7.1f}ms -> {end * 1000:7.1f}ms")
+
+
+def latency(generator: random.Random, milliseconds: float) -> Callable[..., Any]:
+    """A coroutine function taking about `milliseconds`, jittered."""
+
+    async def sleep(*args, **kwargs) -> None:
+        await asyncio.sleep(milliseconds / 1000 * generator.uniform(0.5, 1.5))
+
+    return sleep
+
+
+def stub(args: argparse.Namespace, waterfall: Waterfall) -> Callable[[], Any]:
+    """
+    Replaces Discord and the database with sleeps.
+
+    args:
+        args: The latencies.
+        waterfall: Where the stages are recorded.
+
+    returns:
+        Makes a message create event with a new video.
+    """
+    generator = random.Random(0)
+    discord = latency(generator, args.discord_latency)
+    database = latency(generator, args.db_latency)
+    config = SimpleNamespace(
+        language="en", auto_embed=True, suppress_origin_embed=True, delete_origin=False
+    )
+
+    async def get_guild_config(guild_id: int) -> SimpleNamespace:
+        await database()
+        return config
+
+    async def create_short_url(video_uri: str, douyin: bool = False) -> str:
+        await database()
+        return f"https://m.tiktoker.win/{video_uri[-7:]}"
+
+    tiktok.get_guild_config = waterfall.stage("config", get_guild_config)
+    tiktok.create_short_url = waterfall.stage("short url", create_short_url)
+    tiktok.insert_usage_data = waterfall.stage("usage", database)
+    tiktok.get_tiktok = waterfall.stage("get_tiktok", tiktok.get_tiktok)
+    tiktok.get_video_id = waterfall.stage("video id", tiktok.get_video_id)
+
+    async def reply(*args, **kwargs) -> SimpleNamespace:
+        await discord()
+        return SimpleNamespace(id=3)
+
+    channel = SimpleNamespace(trigger_typing=waterfall.stage("typing", discord))
+    author = SimpleNamespace(id=1, mention="<@1>")
+    guild = SimpleNamespace(id=2)
+
+    def make_event() -> SimpleNamespace:
+        message = SimpleNamespace(
+            author=author,
+            channel=channel,
+            content=f"https://www.tiktok.com/@user/video/{next(VIDEO_IDS)}",
+            guild=guild,
+            _channel_id=4,
+            suppress_embeds=waterfall.stage("suppress embeds", discord),
+            reply=waterfall.stage("reply", reply),
+        )
+        return SimpleNamespace(message=message)
+
+    return make_event
+
+
+def make_scale(waterfall: Waterfall) -> SimpleNamespace:
+    """The TikTok scale's methods, without a bot to register them with."""
+
+    async def fetch_channel(channel_id: int) -> None:
+        pass  # the channel is in the bot's cache, like it was before
+
+    fetch_channel = waterfall.stage("fetch_channel", fetch_channel)
+    scale = SimpleNamespace(
+        bot=SimpleNamespace(user=SimpleNamespace(id=0), fetch_channel=fetch_channel)
+    )
+    for name in ["convert_link", "convert_links", "delete_origin", "record_usage"]:
+        setattr(scale, name, MethodType(getattr(tiktok.TikTok, name), scale))
+    return scale
+
+
+async def serial_on_message_create(
+    scale: SimpleNamespace, event: SimpleNamespace
+) -> None:
+    """on_message_create as it was before, buttons and too big note aside."""
+    links = [
+        link for link in tiktok.find_all_links(event.message.content) if not link.douyin
+    ]
+    config = await tiktok.get_guild_config(event.message.guild.id)
+    if not config.auto_embed:
+        return
+    await event.message.channel.trigger_typing()
+
+    conversions = {}
+    for conversion in await asyncio.gather(
+        *[scale.convert_link(link) for link in links[: tiktok.MAX_LINKS]]
+    ):
+        if conversion:
+            conversions.setdefault(int(conversion[0]), conversion)
+    if not conversions:
+        return
+
+    await event.message.suppress_embeds()
+    await scale.bot.fetch_channel(event.message._channel_id)
+    sent_msg = await event.message.reply(
+        "\n".join(short_url for _, _, short_url in conversions.values())
+    )
+    for video_id in conversions:
+        await tiktok.insert_usage_data(
+            event.message.guild.id, event.message.author.id, video_id, sent_msg.id
+        )
+
+
+async def handle_messages(
+    name: str,
+    on_message_create: Callable[..., Awaitable[None]],
+    args: argparse.Namespace,
+) -> None:
+    originals = {stubbed: getattr(tiktok, stubbed) for stubbed in STUBBED}
+    waterfall = Waterfall()
+    make_event = stub(args, waterfall)
+    scale = make_scale(waterfall)
+    replied, returned = [], []
+    try:
+        await on_message_create(scale, make_event())  # the session connects
+        await drain_background_tasks()
+        waterfall.stages.clear()
+        for _ in range(args.messages):
+            event = make_event()
+            waterfall.reset()
+            await on_message_create(scale, event)
+            returned.append(perf_counter() - waterfall.started)
+            replied.append(waterfall.stages["reply"][-1][1])
+            await drain_background_tasks()  # the next message starts from scratch
+    finally:
+        for stubbed, original in originals.items():
+            setattr(tiktok, stubbed, original)
+
+    report(f"{name}, until the reply is sent", replied)
+    report(f"{name}, until the listener returns", returned)
+    waterfall.report(name)
+
+
+async def run(args: argparse.Namespace) -> None:
+    bodies = load_responses(args.payloads)
+    generator = random.Random(0)
+
+    async def aweme_detail(request: web.Request) -> web.Response:
+        await asyncio.sleep(args.upstream_latency / 1000 * generator.uniform(0.5, 1.5))
+        return web.Response(
+            body=generator.choice(bodies), content_type="application/json"
+        )
+
+    app = web.Application()
+    app.router.add_get("/api2.musical.ly/aweme/v1/aweme/detail/", aweme_detail)
+    runner, base_url = await stand_in.start(app)
+    stand_in.lift_limits()
+    stand_in.route_upstream(base_url)
+    try:
+        await handle_messages("serial (before)", serial_on_message_create, args)
+        await handle_messages("staged", tiktok.TikTok.on_message_create, args)
+    finally:
+        await http.close()
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument(
+        "--discord-latency", type=float, default=50, help="ms a Discord call takes"
+    )
+    parser.add_argument(
+        "--db-latency", type=float, default=5, help="ms a database call takes"
+    )
+    parser.add_argument(
+        "--upstream-latency", type=float, default=80, help="ms get_tiktok's api takes"
+    )
+    parser.add_argument("--payloads", help="a directory of recorded responses")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""helpers shared by the benchmarks"""
+
+from time import perf_counter
+from typing import Callable, List
+
+
+def percentile(samples: List[float], percent: float) -> float:
+    """
+    Gets a percentile of the samples, by nearest rank.
+
+    args:
+        samples: The samples.
+        percent: The percentile, e.g. 99.
+
+    returns:
+        The percentile.
+    """
+    ordered = sorted(samples)
+    rank = round(percent / 100 * len(ordered))
+    return ordered[min(max(rank - 1, 0), len(ordered) - 1)]
+
+
+def report(name: str, samples: List[float]) -> None:
+    """
+    Prints the p50, p99 and max of latencies.
+
+    args:
+        name: What was measured.
+        samples: The latencies, in seconds.
+    """
+    print(
+        f"{name}: n={len(samples)}"
+        f" p50={percentile(samples, 50) * 1000:.2f}ms"
+        f" p99={percentile(samples, 99) * 1000:.2f}ms"
+        f" max={max(samples) * 1000:.2f}ms"
+    )
+
+
+def best_of(repeat: int, func: Callable[[], None]) -> float:
+    """
+    Times a function, keeping the fastest run so noise doesn't count.
+
+    args:
+        repeat: The number of runs.
+        func: The function.
+
+    returns:
+        The seconds of the fastest run.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = perf_counter()
+        func()
+        best = min(best, perf_counter() - started)
+    return best
@@ -0,0 +1,145 @@
+"""
+Latency and memory per resolve of Douyin pages over plain http, against the
+browser the RENDER_DATA was read with before (with --browser, needs
+Chromium), with a local stand-in for www.douyin.com.
+
+Python's allocations are traced per resolve, the browser's own memory is the
+resident size of its processes once it is done (Linux only).
+
+    python -m benchmarks.douyin [--resolves 200] [--browser]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import tracemalloc
+from itertools import cycle
+from pathlib import Path
+from time import perf_counter
+from typing import Awaitable, Callable, List, Optional, Tuple
+from aiohttp import web
+from benchmarks import stand_in
+from benchmarks.common import percentile, report
+from benchmarks.payloads import load_pages
+import tiktoker.utils
+from tiktoker.utils import get_douyin_data, http
+from tiktoker.utils.browser import PAGES
+
+
+async def resolve(
+    resolves: int, resolve_one: Callable[[int], Awaitable[dict]]
+) -> Tuple[List[float], List[int]]:
+    """
+    Resolves one page at a time, untraced and then traced, as tracing slows
+    everything down. Returns the latencies and peak allocations.
+    """
+    latencies = []
+    for number in range(resolves):
+        started = perf_counter()
+        await resolve_one(number)
+        latencies.append(perf_counter() - started)
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for number in range(resolves):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await resolve_one(number)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return latencies, peaks
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """The resident bytes of a process and its children, None if unknown."""
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+    children = {}
+    for stat in proc.glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:  # it exited
+            continue
+        children.setdefault(int(fields[1]), []).append(int(stat.parent.name))
+
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            total += int((proc / str(current) / "statm").read_text().split()[1])
+        except OSError:
+            continue
+    return total * os.sysconf("SC_PAGE_SIZE")
+
+
+def report_memory(name: str, peaks: List[int]) -> None:
+    print(
+        f"{name}: python peak per resolve p50={percentile(peaks, 50) / 1024:.0f}KiB"
+        f" p99={percentile(peaks, 99) / 1024:.0f}KiB"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    pages = cycle(load_pages(args.payloads, 20))
+
+    async def video_page(request: web.Request) -> web.Response:
+        return web.Response(text=next(pages), content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/www.douyin.com/video/{video_id}", video_page)
+    runner, base_url = await stand_in.start(app)
+    stand_in.lift_limits()
+    stand_in.route_upstream(base_url)
+    try:
+        latencies, peaks = await resolve(
+            args.resolves,
+            lambda number: get_douyin_data(
+                f"https://www.douyin.com/video/{7068971038273423621 + number}"
+            ),
+        )
+        report("http", latencies)
+        report_memory("http", peaks)
+
+        if not args.browser:
+            return
+
+        async def no_http(url: str) -> dict:
+            raise ValueError("the browser is measured")
+
+        # the fallback goes straight to the stand-in, the browser isn't rerouted
+        tiktoker.utils._fetch_douyin_data = no_http
+        await PAGES.start()
+        with contextlib.redirect_stdout(io.StringIO()):  # a note per fallback
+            latencies, peaks = await resolve(
+                args.resolves,
+                lambda number: get_douyin_data(
+                    f"{base_url}/www.douyin.com/video/{7068971038273423621 + number}"
+                ),
+            )
+        report("browser", latencies)
+        report_memory("browser", peaks)
+        if (rss := process_tree_rss(PAGES.browser.process.pid)) is not None:
+            print(f"browser: {rss / 1024 / 1024:.0f}MiB resident in its processes")
+    finally:
+        await PAGES.close()
+        await http.close()
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resolves", type=int, default=200)
+    parser.add_argument("--browser", action="store_true", help="also the browser")
+    parser.add_argument("--payloads", help="a directory of recorded pages")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Latency of get_tiktok through the shared session, against a session per call
+as before, with a local stand-in for api2.musical.ly.
+
+The stand-in speaks plain http, so the TLS handshake every new session paid
+upstream isn't part of the difference shown.
+
+    python -m benchmarks.http_client [--calls 1000] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+from itertools import count
+from time import perf_counter
+from typing import List
+from aiohttp import web
+from benchmarks import stand_in
+from benchmarks.common import report
+from benchmarks.payloads import load_responses
+from tiktoker.utils import get_tiktok, http
+
+VIDEO_IDS = count(7068971038273423621)
+"""Every call gets a new video, so none is served from the cache"""
+
+
+async def timed_call() -> float:
+    started = perf_counter()
+    await get_tiktok(next(VIDEO_IDS))
+    return perf_counter() - started
+
+
+async def sequential(calls: int) -> List[float]:
+    return [await timed_call() for _ in range(calls)]
+
+
+async def concurrent(calls: int, concurrency: int) -> List[float]:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def call() -> float:
+        async with slots:
+            return await timed_call()
+
+    return await asyncio.gather(*[call() for _ in range(calls)])
+
+
+async def run(args: argparse.Namespace) -> None:
+    bodies = load_responses(args.payloads, 1)
+    latency = args.latency / 1000
+
+    async def aweme_detail(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.Response(body=bodies[0], content_type="application/json")
+
+    app = web.Application()
+    app.router.add_get("/api2.musical.ly/aweme/v1/aweme/detail/", aweme_detail)
+    runner, base_url = await stand_in.start(app)
+    stand_in.lift_limits()
+    try:
+        for pooled, name in [(False, "session per call"), (True, "shared session")]:
+            stand_in.route_upstream(base_url, pooled)
+            await timed_call()  # the shared session connects once
+            report(f"{name}, sequential", await sequential(args.calls))
+            report(
+                f"{name}, {args.concurrency} at once",
+                await concurrent(args.calls, args.concurrency),
+            )
+    finally:
+        await http.close()
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="ms the stand-in takes to respond"
+    )
+    parser.add_argument("--payloads", help="a directory of recorded responses")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Decode time and allocations of aweme detail responses with the stdlib
+decoder as before, with orjson (when installed), and with only the fields
+TikTokData reads kept (`select_fields`).
+
+    python -m benchmarks.json_decoding [--repeat 200]
+"""
+
+import argparse
+import json
+import tracemalloc
+from itertools import cycle, islice
+from time import perf_counter
+from typing import Any, Callable, List
+from benchmarks.common import percentile, report
+from benchmarks.payloads import load_responses
+from tiktoker.models import AWEME_DETAIL_FIELDS
+from tiktoker.utils.http import select_fields
+
+RESPONSE_FIELDS = {"status_code": None, "aweme_detail": AWEME_DETAIL_FIELDS}
+
+
+def decode_times(
+    bodies: List[bytes], repeat: int, decode: Callable[[bytes], Any]
+) -> List[float]:
+    samples = []
+    for body in islice(cycle(bodies), repeat):
+        started = perf_counter()
+        decode(body)
+        samples.append(perf_counter() - started)
+    return samples
+
+
+def allocations(bodies: List[bytes], decode: Callable[[bytes], Any]) -> None:
+    """Prints the peak allocated while decoding, and what the result keeps."""
+    peaks, kept = [], []
+    tracemalloc.start()
+    try:
+        for body in bodies:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            result = decode(body)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            kept.append(current - before)
+            del result
+    finally:
+        tracemalloc.stop()
+    print(
+        f"  peak p50={percentile(peaks, 50) / 1024:.0f}KiB,"
+        f" kept p50={percentile(kept, 50) / 1024:.0f}KiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--payloads", help="a directory of recorded responses")
+    args = parser.parse_args()
+
+    bodies = load_responses(args.payloads)
+    print(f"{len(bodies)} responses, {sum(map(len, bodies)) // len(bodies)} bytes each")
+    decoders = [("json (before)", json.loads)]
+    try:
+        import orjson
+
+        decoders.append(("orjson", orjson.loads))
+    except ImportError:
+        print("Note: orjson isn't installed, the shared http layer uses json")
+    for name, loads in list(decoders):
+
+        def decode_selected(body: bytes, loads: Callable[[bytes], Any] = loads) -> Any:
+            return select_fields(loads(body), RESPONSE_FIELDS)
+
+        decoders.append((f"{name}, selected fields", decode_selected))
+
+    for name, decode in decoders:
+        report(name, decode_times(bodies, args.repeat, decode))
+        allocations(bodies, decode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Messages per second of the link scanner, against the six regex searches per
+message it replaced, over chat messages that mostly have no link.
+
+    python -m benchmarks.links [--messages 100000] [--link-ratio 0.02]
+"""
+
+import argparse
+import random
+import re
+from typing import List, Optional
+from benchmarks.common import best_of
+from tiktoker.models import LinkData
+from tiktoker.utils import LINK_PATTERNS, check_for_link, find_all_links
+
+LINKS = [
+    "https://www.tiktok.com/@placeholder/video/7068971038273423621",
+    "https://vm.tiktok.com/PTPdh1wVay/",
+    "https://m.tiktok.com/v/7068971038273423621.html",
+    "https://www.tiktok.com/foryou?_r=1&is_from_webapp=v1&item_id=7068971038273423621",
+    "https://www.douyin.com/video/7068971038273423621",
+    "https://v.douyin.com/NeXy7Ab/",
+]
+WORDS = (
+    "hey lol lmao did you see this yeah no maybe tomorrow tonight gg wp ok "
+    "the a is it that what when why how bro dude omg wtf idk tbh ngl fr "
+    "tiktok douyin video clip stream game ranked queue anyone up for "
+    "https://youtube.com/watch?v=dQw4w9WgXcQ https://twitter.com/user/status/1 "
+    "<@123456789012345678> :kekw: :pog: 😂 👀"
+).split()
+
+
+def legacy_check_for_link(content: str) -> Optional["LinkData"]:
+    """What check_for_link did before: search every pattern, then pick one."""
+    matches = {
+        video_id_type: re.search(pattern, content)
+        for video_id_type, pattern in LINK_PATTERNS.items()
+    }
+    for video_id_type, match in matches.items():
+        if match:
+            name = video_id_type.name
+            url = match.group(0)
+            if not match.group(f"{name}_http"):
+                url = f"https://{url}"
+            return LinkData.from_list(
+                [
+                    video_id_type,
+                    match.group(f"{name}_id"),
+                    url,
+                    name.startswith("DOUYIN"),
+                ]
+            )
+    return None
+
+
+def chat_messages(count: int, link_ratio: float) -> List[str]:
+    """Messages of 1 to 30 words, `link_ratio` of them with a link."""
+    generator = random.Random(0)
+    messages = []
+    for _ in range(count):
+        words = [generator.choice(WORDS) for _ in range(generator.randint(1, 30))]
+        if generator.random() < link_ratio:
+            words.insert(generator.randint(0, len(words)), generator.choice(LINKS))
+        messages.append(" ".join(words))
+    return messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--link-ratio", type=float, default=0.02)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    messages = chat_messages(args.messages, args.link_ratio)
+    mismatches = sum(
+        check_for_link(content) != legacy_check_for_link(content)
+        for content in messages
+    )
+    print(f"{len(messages)} messages, {mismatches} results differ from before")
+
+    for name, scan in [
+        ("before (six searches)", legacy_check_for_link),
+        ("check_for_link", check_for_link),
+        ("find_all_links", find_all_links),
+    ]:
+        seconds = best_of(args.repeat, lambda: [scan(content) for content in messages])
+        print(f"{name}: {len(messages) / seconds:,.0f} messages/s")
+
+
+if __name__ == "__main__":
+    main()
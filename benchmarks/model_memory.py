@@ -0,0 +1,90 @@
+"""
+Memory kept per cached video: the decoded aweme_detail, only its selected
+fields, TikTokData with a __dict__ per object as before (the models' base,
+DictSerializationMixin, had no __slots__), and the slotted TikTokData.
+
+    python -m benchmarks.model_memory [--objects 2000]
+"""
+
+import argparse
+import gc
+import tracemalloc
+from contextlib import contextmanager
+from itertools import cycle, islice
+from typing import Any, Callable, Iterator, List
+from benchmarks.payloads import load_responses
+from tiktoker import models
+from tiktoker.models import AWEME_DETAIL_FIELDS
+from tiktoker.utils.http import loads, select_fields
+
+MODELS = ["Video", "Statistics", "Music", "Author", "Description", "TikTokData"]
+
+
+class WithDict:
+    """A base without __slots__, like DictSerializationMixin."""
+
+
+@contextmanager
+def models_with_dict() -> Iterator[None]:
+    """Gives every model a __dict__, nested ones included, like before."""
+    originals = {name: getattr(models, name) for name in MODELS}
+    try:
+        for name, model in originals.items():
+            setattr(models, name, type(name, (model, WithDict), {}))
+        yield
+    finally:
+        for name, model in originals.items():
+            setattr(models, name, model)
+
+
+def kept_per_object(
+    bodies: List[bytes], objects: int, make: Callable[[bytes], Any]
+) -> float:
+    """The bytes still allocated per object made, once what it was made from is gone."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [make(body) for body in islice(cycle(bodies), objects)]
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size / objects
+
+
+def aweme_detail(body: bytes) -> dict:
+    return loads(body)["aweme_detail"]
+
+
+def selected_fields(body: bytes) -> dict:
+    return select_fields(aweme_detail(body), AWEME_DETAIL_FIELDS)
+
+
+def tiktok_data(body: bytes) -> "models.TikTokData":
+    return models.TikTokData.from_dict(selected_fields(body))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--objects", type=int, default=2000)
+    parser.add_argument("--payloads", help="a directory of recorded responses")
+    args = parser.parse_args()
+
+    bodies = load_responses(args.payloads)
+    for name, make in [
+        ("aweme_detail dict", aweme_detail),
+        ("selected fields dict", selected_fields),
+    ]:
+        print(f"{name}: {kept_per_object(bodies, args.objects, make):,.0f} bytes")
+    with models_with_dict():
+        size = kept_per_object(bodies, args.objects, tiktok_data)
+        print(f"TikTokData with __dict__ (before): {size:,.0f} bytes")
+    size = kept_per_object(bodies, args.objects, tiktok_data)
+    print(f"TikTokData: {size:,.0f} bytes")
+    print(f"TikTokData has a __dict__: {hasattr(tiktok_data(bodies[0]), '__dict__')}")
+
+
+if __name__ == "__main__":
+    main()
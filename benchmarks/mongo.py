@@ -0,0 +1,47 @@
+"""
+A local mongod for the benchmarks that need one, they are skipped without it.
+
+The benchmarks use their own database, which is dropped before and after,
+set BENCH_MONGO_URL to use another mongod than the one on localhost.
+"""
+
+from os import environ
+from typing import Optional
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
+from tiktoker import db
+from tiktoker.db.models import __beanie_models__
+
+MONGO_URL = environ.get("BENCH_MONGO_URL") or "mongodb://localhost:27017"
+DATABASE = "tiktoker_benchmark"
+
+
+async def connect() -> Optional[AsyncIOMotorDatabase]:
+    """
+    Sets up the models on an empty benchmark database.
+
+    returns:
+        The database, None when there is no mongod.
+    """
+    client = AsyncIOMotorClient(MONGO_URL, serverSelectionTimeoutMS=2000)
+    try:
+        await client.admin.command("ping")
+    except PyMongoError as e:
+        print(f"Skipped: no mongod at {MONGO_URL} ({type(e).__name__})")
+        return None
+    await client.drop_database(DATABASE)
+    database = client[DATABASE]
+    await init_beanie(database=database, document_models=__beanie_models__)
+    db.READY.set()
+    return database
+
+
+async def drop(database: AsyncIOMotorDatabase) -> None:
+    """
+    Drops the benchmark database.
+
+    args:
+        database: The database.
+    """
+    await database.client.drop_database(DATABASE)
@@ -0,0 +1,80 @@
+"""
+Parsing batches of aweme_details into TikTokData on the event loop, in a
+thread pool and in a process pool (PARSE_EXECUTOR), measuring how long the
+loop is blocked, the lag a gateway heartbeat would see, and the batch time.
+
+    python -m benchmarks.parsing [--batch 200] [--repeat 10]
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import cycle, islice
+from time import perf_counter
+from typing import List, Optional
+from benchmarks.common import report
+from benchmarks.payloads import load_responses
+import tiktoker.utils
+from tiktoker.models import AWEME_DETAIL_FIELDS
+from tiktoker.utils import parse_tiktoks
+from tiktoker.utils.http import loads, select_fields
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """The most a sleep of `interval` overslept until `stop` is set."""
+    loop = asyncio.get_running_loop()
+    lag = 0.0
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(lag, loop.time() - expected)
+    return lag
+
+
+async def parse_batches(
+    bodies: List[bytes], batch: int, repeat: int, executor: Optional[Executor]
+) -> None:
+    tiktoker.utils.PARSE_EXECUTOR = executor
+    lags, durations = [], []
+    for _ in range(repeat):
+        # parsing changes the dicts, every batch is decoded again
+        datas = [
+            select_fields(loads(body)["aweme_detail"], AWEME_DETAIL_FIELDS)
+            for body in islice(cycle(bodies), batch)
+        ]
+        stop = asyncio.Event()
+        lag = asyncio.create_task(measure_lag(stop))
+        await asyncio.sleep(0.01)  # the ticker is running
+        started = perf_counter()
+        await parse_tiktoks(datas)
+        durations.append(perf_counter() - started)
+        stop.set()
+        lags.append(await lag)
+
+    name = "event loop" if executor is None else type(executor).__name__
+    report(f"{name}, batch of {batch}", durations)
+    report(f"{name}, loop lag", lags)
+
+
+async def run(args: argparse.Namespace) -> None:
+    bodies = load_responses(args.payloads)
+    await parse_batches(bodies, args.batch, args.repeat, None)
+    with ThreadPoolExecutor(args.workers) as executor:
+        await parse_batches(bodies, args.batch, args.repeat, executor)
+    with ProcessPoolExecutor(args.workers) as executor:
+        list(executor.map(abs, range(args.workers)))  # the workers are started
+        await parse_batches(bodies, args.batch, args.repeat, executor)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--payloads", help="a directory of recorded responses")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,500 @@
+"""
+Upstream payloads for the benchmarks.
+
+The generated ones are shaped like api2.musical.ly aweme_detail responses
+and Douyin video pages: the same nesting, url_lists, bit rates, text_extra
+and RENDER_DATA, at about the same size. Recorded ones can be used instead,
+see `load_responses` and `load_pages`.
+"""
+
+import json
+import random
+import urllib.parse
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+def _url_list(generator: random.Random, path: str, count: int = 3) -> List[str]:
+    token = "%032x" % generator.getrandbits(128)
+    return [
+        f"https://{host}/{path}/{token}/?a=1233&br=2124&bt=1062&cd=0%7C0%7C0"
+        f"&ch=0&cr=0&cs=0&cv=1&dr=0&ds=3&er=&ft=eXd.6HbHMyq8Z-D_Ae2&l=2022031"
+        f"5{generator.getrandbits(40):x}&lr=tiktok_m&mime_type=video_mp4"
+        f"&net=0&pl=0&qs=0&rc=M3Y4ZDM6ZnRvOzMzZzczNEApZ2VoNDU8ZmU5N2k2NmY7"
+        f"aGdvNC9ncjRnbDJgLS1kMS9zczYxLTQ1MjRhLWEuLzNhXzI6Yw%3D%3D"
+        f"&x-expires=1647403200&x-signature={generator.getrandbits(120):x}"
+        for host in [
+            "v16m.tiktokcdn.com",
+            "v19.tiktokcdn.com",
+            "api16-normal-c-useast1a.tiktokv.com",
+            "v77.tiktokcdn.com",
+        ][:count]
+    ]
+
+
+def _addr(generator: random.Random, path: str, data_size: int = None) -> dict:
+    addr = {
+        "uri": "%032x" % generator.getrandbits(128),
+        "url_list": _url_list(generator, path),
+        "width": 720,
+        "height": 1280,
+        "url_key": "v09044g40000c8o5ce3c77u3q8fu4hn0_h264_540p_%d"
+        % generator.randint(100000, 999999),
+    }
+    if data_size is not None:
+        addr.update(data_size=data_size, file_hash="%032x" % generator.getrandbits(128))
+    return addr
+
+
+def _user(generator: random.Random) -> dict:
+    handle = "user%d" % generator.randint(10**6, 10**9)
+    return {
+        "uid": str(generator.getrandbits(63)),
+        "short_id": "0",
+        "nickname": handle.title(),
+        "signature": "link in bio ✨ business: %s@gmail.com" % handle,
+        "unique_id": handle,
+        "avatar_thumb": _addr(generator, "tos-useast2a-avt-0068-giso"),
+        "avatar_medium": _addr(generator, "tos-useast2a-avt-0068-giso"),
+        "avatar_larger": _addr(generator, "tos-useast2a-avt-0068-giso"),
+        "follower_count": generator.randint(0, 10**7),
+        "following_count": generator.randint(0, 10**4),
+        "region": "US",
+        "language": "en",
+        "verification_type": 0,
+        "custom_verify": "",
+        "enterprise_verify_reason": "",
+        "is_ad_fake": False,
+        "followers_detail": None,
+        "platform_sync_info": None,
+        "geofencing": None,
+        "cover_url": [_addr(generator, "tos-maliva-p-0068")],
+        "item_list": None,
+        "type_label": None,
+        "ad_cover_url": None,
+        "relative_users": None,
+        "cha_list": None,
+        "sec_uid": "MS4wLjABAAAA%043x" % generator.getrandbits(172),
+        "need_points": None,
+        "homepage_bottom_toast": None,
+        "can_set_geofencing": None,
+        "white_cover_url": None,
+        "user_tags": None,
+        "bold_fields": None,
+        "search_highlight": None,
+        "mutual_relation_avatars": None,
+        "events": None,
+        "advance_feature_item_order": None,
+        "advanced_feature_info": None,
+        "user_profile_guide": None,
+        "shield_edit_field_info": None,
+    }
+
+
+def _music(generator: random.Random, owner: dict) -> dict:
+    music_id = generator.getrandbits(62)
+    return {
+        "id": music_id,
+        "id_str": str(music_id),
+        "title": "original sound - %s" % owner["unique_id"],
+        "author": owner["nickname"],
+        "album": "",
+        "cover_hd": _addr(generator, "tos-useast2a-avt-0068-giso"),
+        "cover_large": _addr(generator, "tos-useast2a-avt-0068-giso"),
+        "cover_medium": _addr(generator, "tos-useast2a-avt-0068-giso"),
+        "cover_thumb": _addr(generator, "tos-useast2a-avt-0068-giso"),
+        "play_url": _addr(generator, "tos-useast2a-ve-2774"),
+        "source_platform": 72,
+        "duration": generator.randint(5, 60),
+        "extra": json.dumps({"aed_music_dur": 23.3, "beats": {}, "hash_id": "x"}),
+        "user_count": 0,
+        "position": None,
+        "collect_stat": 0,
+        "status": 1,
+        "offline_desc": "",
+        "owner_id": owner["uid"],
+        "owner_nickname": owner["nickname"],
+        "is_original": False,
+        "mid": str(music_id),
+        "binded_challenge_id": 0,
+        "author_deleted": False,
+        "owner_handle": owner["unique_id"],
+        "author_position": None,
+        "prevent_download": False,
+        "external_song_info": [],
+        "sec_uid": owner["sec_uid"],
+        "avatar_thumb": owner["avatar_thumb"],
+        "avatar_medium": owner["avatar_medium"],
+        "avatar_large": owner["avatar_larger"],
+        "preview_start_time": 0,
+        "preview_end_time": 0,
+        "is_commerce_music": True,
+        "is_original_sound": True,
+        "artists": [],
+        "lyric_short_position": None,
+        "mute_share": False,
+        "tag_list": None,
+        "is_author_artist": False,
+        "is_pgc": False,
+        "search_highlight": None,
+        "multi_bit_rate_play_info": None,
+        "tt_to_dsp_song_infos": None,
+        "recommend_status": 100,
+        "uncert_artists": None,
+    }
+
+
+def aweme_detail(video_id: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Generates an aweme_detail.
+
+    args:
+        video_id: The aweme id.
+        seed: Different seeds generate different videos.
+
+    returns:
+        The aweme_detail.
+    """
+    generator = random.Random(seed * 1000003 + video_id)
+    author = _user(generator)
+    tags = ["fyp", "foryou", "viral", "funny", "comedy", "dance", "trend", "xyzbca"]
+    tags = generator.sample(tags, generator.randint(1, len(tags)))
+    desc = "when the bass drops at 3am 😂 " + " ".join(f"#{tag}" for tag in tags)
+    text_extra = []
+    for tag in tags:
+        start = desc.index(f"#{tag}")
+        text_extra.append(
+            {
+                "start": start,
+                "end": start + len(tag) + 1,
+                "type": 1,
+                "hashtag_name": tag,
+                "hashtag_id": str(generator.getrandbits(60)),
+                "is_commerce": False,
+                "user_id": "",
+                "sec_uid": "",
+                "aweme_id": "",
+            }
+        )
+    size = generator.randint(500000, 60000000)
+    return {
+        "aweme_id": str(video_id),
+        "desc": desc,
+        "create_time": 1647300000 + generator.randint(0, 10**6),
+        "author": author,
+        "music": _music(generator, author),
+        "cha_list": [
+            {
+                "cid": extra["hashtag_id"],
+                "cha_name": extra["hashtag_name"],
+                "desc": "Watch the latest #%s videos" % extra["hashtag_name"],
+                "schema": "aweme://aweme/challenge/detail?cid=%s" % extra["hashtag_id"],
+                "author": _user(generator),
+                "user_count": 0,
+                "share_info": {
+                    "share_url": "https://m.tiktok.com/h5/share/tag/%s.html"
+                    % extra["hashtag_id"],
+                    "share_desc": "Check out #%s on TikTok!" % extra["hashtag_name"],
+                    "share_title": "It is a becoming a big trend on TikTok now!",
+                },
+                "connect_music": [],
+                "type": 1,
+                "sub_type": 0,
+                "is_pgcshow": False,
+                "collect_stat": 0,
+                "is_challenge": 0,
+                "view_count": generator.randint(0, 10**11),
+                "is_commerce": False,
+                "hashtag_profile": "",
+                "cha_attrs": None,
+                "banner_list": None,
+                "extra_attr": {"is_live": False},
+                "show_items": None,
+                "search_highlight": None,
+            }
+            for extra in text_extra
+        ],
+        "video": {
+            "play_addr": _addr(generator, "tos-useast2a-ve-0068c004", size),
+            "cover": _addr(generator, "tos-useast2a-p-0037-aiso"),
+            "height": 1280,
+            "width": 720,
+            "dynamic_cover": _addr(generator, "tos-useast2a-p-0037-aiso"),
+            "origin_cover": _addr(generator, "tos-useast2a-p-0037-aiso"),
+            "ratio": "540p",
+            "download_addr": _addr(generator, "tos-useast2a-ve-0068c001", size),
+            "has_watermark": True,
+            "bit_rate": [
+                {
+                    "gear_name": gear,
+                    "quality_type": quality,
+                    "bit_rate": generator.randint(300000, 3000000),
+                    "play_addr": _addr(generator, "tos-useast2a-ve-0068c004", size),
+                    "is_h265": 0,
+                    "is_bytevc1": 0,
+                    "dub_infos": None,
+                }
+                for gear, quality in [
+                    ("normal_720_0", 10),
+                    ("normal_540_0", 20),
+                    ("lower_540_0", 24),
+                    ("lowest_540_0", 25),
+                ]
+            ],
+            "duration": generator.randint(5000, 60000),
+            "download_suffix_logo_addr": _addr(generator, "tos-useast2a-ve-0068c001"),
+            "has_download_suffix_logo_addr": True,
+            "is_callback": True,
+            "cla_info": {
+                "has_original_audio": 0,
+                "enable_auto_caption": 0,
+                "original_language_info": None,
+                "caption_infos": None,
+                "no_caption_reason": 2,
+            },
+            "is_long_video": None,
+        },
+        "share_url": "https://www.tiktok.com/@%s/video/%d?_d=secCgYIASAHKAESPgo8"
+        "&language=en&preview_pb=0&sec_user_id=%s&share_item_id=%d&source=h5_m"
+        ".html" % (author["unique_id"], video_id, author["sec_uid"], video_id),
+        "user_digged": 0,
+        "statistics": {
+            "aweme_id": str(video_id),
+            "comment_count": generator.randint(1, 10**5),
+            "digg_count": generator.randint(1, 10**7),
+            "download_count": generator.randint(1, 10**5),
+            "play_count": generator.randint(1, 10**8),
+            "share_count": generator.randint(1, 10**5),
+            "forward_count": 0,
+            "lose_count": 0,
+            "lose_comment_count": 0,
+            "whatsapp_share_count": generator.randint(0, 10**4),
+            "collect_count": generator.randint(0, 10**5),
+        },
+        "status": {
+            "aweme_id": str(video_id),
+            "is_delete": False,
+            "allow_share": True,
+            "allow_comment": True,
+            "is_private": False,
+            "with_goods": False,
+            "private_status": 0,
+            "in_reviewing": False,
+            "reviewed": 1,
+            "self_see": False,
+            "is_prohibited": False,
+            "download_status": 0,
+        },
+        "rate": 12,
+        "text_extra": text_extra,
+        "is_top": 0,
+        "label_top": _addr(generator, "tos-maliva-p-0000"),
+        "share_info": {
+            "share_url": "https://www.tiktok.com/@%s/video/%d"
+            % (author["unique_id"], video_id),
+            "share_desc": "Check out %s's video! #TikTok" % author["nickname"],
+            "share_title": "Check out %s’s video! #TikTok > " % author["nickname"],
+            "bool_persist": 0,
+            "share_title_myself": "",
+            "share_title_other": "",
+            "share_link_desc": "#%s on TikTok %%s" % author["nickname"],
+            "share_signature_url": "",
+            "share_signature_desc": "",
+            "share_quote": "",
+            "whatsapp_desc": "Download TikTok and watch more fun videos:",
+        },
+        "distance": "",
+        "video_labels": [],
+        "is_vr": False,
+        "is_ads": False,
+        "aweme_type": 0,
+        "cmt_swt": False,
+        "image_infos": None,
+        "risk_infos": {
+            "vote": False,
+            "warn": False,
+            "risk_sink": False,
+            "type": 0,
+            "content": "",
+        },
+        "is_relieve": False,
+        "sort_label": "",
+        "position": None,
+        "uniqid_position": None,
+        "author_user_id": int(author["uid"]),
+        "bodydance_score": 0,
+        "geofencing": [],
+        "is_hash_tag": 1,
+        "is_pgcshow": False,
+        "region": "US",
+        "video_text": [],
+        "collect_stat": 0,
+        "label_top_text": None,
+        "promotions": [],
+        "group_id": str(video_id),
+        "prevent_download": False,
+        "nickname_position": None,
+        "challenge_position": None,
+        "item_comment_settings": 0,
+        "with_promotional_music": False,
+        "long_video": None,
+        "item_duet": 0,
+        "item_react": 0,
+        "desc_language": "en",
+        "interaction_stickers": None,
+        "misc_info": json.dumps({"count_info": {"aweme_id": str(video_id)}}),
+        "origin_comment_ids": None,
+        "commerce_config_data": None,
+        "distribute_type": 2,
+        "video_control": {
+            "allow_download": True,
+            "share_type": 1,
+            "show_progress_bar": 1,
+            "draft_progress_bar": 1,
+            "allow_duet": True,
+            "allow_react": True,
+            "prevent_download_type": 0,
+            "allow_dynamic_wallpaper": True,
+            "timer_status": 1,
+            "allow_music": True,
+            "allow_stitch": True,
+        },
+        "commerce_info": {
+            "auction_ad_invited": False,
+            "with_comment_filter_words": False,
+            "avatar_ad_label": None,
+        },
+        "added_sound_music_info": _music(generator, author),
+        "need_vs_entry": False,
+        "anchors": None,
+        "anchors_extras": "",
+        "hybrid_label": None,
+        "geofencing_regions": None,
+        "cover_labels": None,
+        "mask_infos": [],
+        "search_highlight": None,
+        "playlist_blocked": False,
+        "green_screen_materials": None,
+        "interact_permission": {
+            "duet": 0,
+            "stitch": 0,
+            "duet_privacy_setting": 0,
+            "stitch_privacy_setting": 0,
+            "upvote": 0,
+        },
+        "question_list": None,
+        "content_desc": "",
+        "content_desc_extra": [],
+        "products_info": None,
+        "follow_up_publish_from_id": 0,
+        "disable_search_trending_bar": False,
+        "music_begin_time_in_ms": 0,
+        "item_distribute_source": "",
+        "item_source_category": 0,
+        "branded_content_accounts": None,
+        "is_description_translatable": True,
+        "follow_up_item_id_groups": "",
+        "is_text_sticker_translatable": False,
+        "text_sticker_major_lang": "un",
+        "original_client_text": {"markup_text": desc, "text_extra": text_extra},
+    }
+
+
+def aweme_detail_response(video_id: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Generates an aweme detail response.
+
+    args:
+        video_id: The aweme id.
+        seed: Different seeds generate different videos.
+
+    returns:
+        The response.
+    """
+    return {
+        "status_code": 0,
+        "aweme_detail": aweme_detail(video_id, seed),
+        "log_pb": {"impr_id": "20220315%020x" % video_id},
+        "extra": {"now": 1647400000000, "fatal_item_ids": None, "logid": "x"},
+        "status_msg": "",
+    }
+
+
+def load_responses(directory: str = None, count: int = 20) -> List[bytes]:
+    """
+    Loads recorded aweme detail responses, the *.json files in a directory,
+    or generates `count` of them without one.
+
+    args:
+        directory: The directory with the recorded responses.
+        count: The number of responses generated without a directory.
+
+    returns:
+        The response bodies.
+    """
+    if directory is not None:
+        return [file.read_bytes() for file in sorted(Path(directory).glob("*.json"))]
+    return [
+        json.dumps(aweme_detail_response(7068971038273423621 + seed, seed)).encode()
+        for seed in range(count)
+    ]
+
+
+def douyin_page(video_id: int, seed: int = 0) -> str:
+    """
+    Generates a Douyin video page, with its RENDER_DATA.
+
+    args:
+        video_id: The aweme id.
+        seed: Different seeds generate different videos.
+
+    returns:
+        The html.
+    """
+    generator = random.Random(seed * 1000003 + video_id)
+    detail = aweme_detail(video_id, seed)
+    detail["video"]["playApi"] = (
+        "//aweme.snssdk.com/aweme/v1/play/?video_id=v0200fg10000%020x"
+        "&ratio=720p&line=0" % generator.getrandbits(80)
+    )
+    render_data = {
+        "1": {"ua": "Mozilla/5.0", "isClient": False, "abTestData": {}},
+        "32": {"awemeId": str(video_id), "aweme": {"statusCode": 0, "detail": detail}},
+        "app": {"headerData": {}, "commentData": {"comments": []}},
+    }
+    scripts = "".join(
+        '<script src="//lf1-cdn-tos.bytegoofy.com/goofy/ies/douyin_web/%x.js">'
+        "</script>" % generator.getrandbits(64)
+        for _ in range(40)
+    )
+    inline = "".join(
+        "<script>!function(){var e=window.__%x=window.__%x||[];e.push(%s)}()"
+        "</script>"
+        % (i, i, json.dumps({"t": generator.getrandbits(40), "k": "x" * 400}))
+        for i in range(200)
+    )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="UTF-8">'
+        "<title>Douyin</title>%s</head><body>"
+        '<div id="root"></div>%s'
+        '<script id="RENDER_DATA" type="application/json">%s</script>'
+        "</body></html>"
+        % (scripts, inline, urllib.parse.quote(json.dumps(render_data)))
+    )
+
+
+def load_pages(directory: str = None, count: int = 20) -> List[str]:
+    """
+    Loads recorded Douyin video pages, the *.html files in a directory, or
+    generates `count` of them without one.
+
+    args:
+        directory: The directory with the recorded pages.
+        count: The number of pages generated without a directory.
+
+    returns:
+        The pages.
+    """
+    if directory is not None:
+        return [file.read_text() for file in sorted(Path(directory).glob("*.html"))]
+    return [douyin_page(7068971038273423621 + seed, seed) for seed in range(count)]
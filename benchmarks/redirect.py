@@ -0,0 +1,115 @@
+"""
+Requests/s and latency of the redirect server on a local mongod seeded with
+short urls (skipped without one, see mongo.py): every slug once while none
+is cached, then again from the cache, and slugs that don't exist.
+
+The load is generated in the same process as the server, so the numbers
+are what one core serves while also making the requests.
+
+    python -m benchmarks.redirect [--slugs 100000] [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import random
+import socket
+from time import perf_counter
+from typing import List
+import aiohttp
+from benchmarks import mongo
+from benchmarks.common import report
+from tiktoker.db.models import Shortener
+from tiktoker.utils import redirect
+from tiktoker.utils.shortener import SHORT_URL_BASE, make_slug
+
+SEED_BATCH = 10000
+
+
+async def seed(slugs: int) -> List[str]:
+    collection = Shortener.get_motor_collection()
+    seeded = []
+    for start in range(0, slugs, SEED_BATCH):
+        entries = []
+        for number in range(start, min(start + SEED_BATCH, slugs)):
+            video_uri = "v0200fg10000c8o5ce3c77u3q%07d" % number
+            slug = make_slug(video_uri)
+            entries.append(
+                {
+                    "video_uri": video_uri,
+                    "slug": slug,
+                    "shortened_url": SHORT_URL_BASE + slug,
+                    "douyin": number % 10 == 0,
+                }
+            )
+            seeded.append(slug)
+        await collection.insert_many(entries, ordered=False)
+    return seeded
+
+
+async def load(
+    name: str, base_url: str, slugs: List[str], concurrency: int, status: int
+) -> None:
+    """Requests every slug from `concurrency` connections."""
+    latencies = []
+    pending = iter(slugs)
+
+    async def worker(session: aiohttp.ClientSession) -> None:
+        for slug in pending:
+            started = perf_counter()
+            async with session.get(f"{base_url}/{slug}", allow_redirects=False) as r:
+                assert r.status == status, r.status
+            latencies.append(perf_counter() - started)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = perf_counter()
+        await asyncio.gather(*[worker(session) for _ in range(concurrency)])
+        seconds = perf_counter() - started
+    print(f"{name}: {len(slugs) / seconds:,.0f} requests/s")
+    report(name, latencies)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(args: argparse.Namespace) -> None:
+    if (database := await mongo.connect()) is None:
+        return
+    port = free_port()
+    try:
+        slugs = await seed(args.slugs)
+        generator = random.Random(0)
+        requested = generator.sample(slugs, min(args.requests, len(slugs)))
+        await redirect.start("127.0.0.1", port)
+        base_url = f"http://127.0.0.1:{port}"
+
+        for name, batch, status in [
+            ("not cached", requested, 302),
+            ("cached", requested, 302),
+            (
+                "unknown slugs",
+                [make_slug(str(n), 99) for n in range(len(requested))],
+                404,
+            ),
+        ]:
+            await load(name, base_url, batch, args.concurrency, status)
+        print(f"redirect: {redirect.stats()}")
+    finally:
+        await redirect.stop()
+        await mongo.drop(database)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slugs", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Time to import every scale in a fresh interpreter, translations included,
+against the msgfmt process per language and domain every boot started
+before.
+
+With --stale every .po file is touched first, so the catalogs are compiled
+again (in-process) like on the first boot after they changed.
+
+    python -m benchmarks.scale_imports [--runs 10] [--stale]
+"""
+
+import argparse
+import subprocess
+import sys
+from os import utime
+from pathlib import Path
+from time import perf_counter
+from typing import List
+from benchmarks.common import report
+
+ROOT = Path(__file__).resolve().parents[1]
+LOCALE_DIR = ROOT / "tiktoker" / "locale"
+IMPORT_SCALES = """
+from time import perf_counter
+started = perf_counter()
+import importlib
+from tiktoker.utils import get_scales
+for scale in get_scales("tiktoker/scales"):
+    importlib.import_module(scale)
+print(perf_counter() - started)
+"""
+
+
+def import_scales() -> float:
+    """Imports the scales in a new interpreter, returns the seconds it took."""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCALES],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.splitlines()[-1])
+
+
+def touch_catalogs() -> None:
+    for po_file in LOCALE_DIR.glob("*/LC_MESSAGES/*.po"):
+        utime(po_file)
+
+
+def msgfmt_processes() -> float:
+    """Runs msgfmt.py in a process per catalog as before, returns the seconds."""
+    started = perf_counter()
+    for po_file in sorted(LOCALE_DIR.glob("*/LC_MESSAGES/*.po")):
+        subprocess.run(
+            [sys.executable, str(ROOT / "tiktoker" / "utils" / "msgfmt.py"), po_file],
+            cwd=ROOT,
+            capture_output=True,
+            check=True,
+        )
+    return perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--stale", action="store_true", help="recompile catalogs")
+    args = parser.parse_args()
+
+    import_scales()  # writes the bytecode and catalogs that are missing
+    samples: List[float] = []
+    for _ in range(args.runs):
+        if args.stale:
+            touch_catalogs()
+        samples.append(import_scales())
+    report("import every scale" + (", catalogs stale" if args.stale else ""), samples)
+    report(
+        "before, a msgfmt process per catalog",
+        [msgfmt_processes() for _ in range(args.runs)],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+A local aiohttp server standing in for the upstream hosts.
+
+Once `route_upstream` is called, a request of `tiktoker.utils.http` to
+https://<host>/<path> goes to <stand-in>/<host>/<path> instead.
+"""
+
+import urllib.parse
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Tuple
+import aiohttp
+from aiohttp import web
+from tiktoker.utils import http, scheduler
+
+_get_session = http.get_session
+
+
+async def start(app: web.Application) -> Tuple[web.AppRunner, str]:
+    """
+    Serves an app on a free local port.
+
+    args:
+        app: The app.
+
+    returns:
+        The runner, and the url the app is served at.
+    """
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}"
+
+
+class _Rerouted:
+    def __init__(self, base_url: str, pooled: bool):
+        self.base_url = base_url
+        self.pooled = pooled
+
+    def request(self, method: str, url: str, **kwargs):
+        parts = urllib.parse.urlsplit(url)
+        url = f"{self.base_url}/{parts.hostname}{parts.path}?{parts.query}"
+        if self.pooled:
+            return _get_session().request(method, url, **kwargs)
+        return self._request_unpooled(method, url, **kwargs)
+
+    @asynccontextmanager
+    async def _request_unpooled(
+        self, method: str, url: str, **kwargs
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        async with aiohttp.ClientSession() as session:
+            async with session.request(method, url, **kwargs) as response:
+                yield response
+
+
+def route_upstream(base_url: str, pooled: bool = True) -> None:
+    """
+    Sends the upstream requests to the stand-in.
+
+    args:
+        base_url: The url the stand-in is served at.
+        pooled: If the shared session is used, otherwise every request gets
+            a session of its own, as it did before there was a shared one.
+    """
+    rerouted = _Rerouted(base_url, pooled)
+    http.get_session = lambda: rerouted
+
+
+def lift_limits() -> None:
+    """Lets every upstream request go at once, the scheduler isn't measured."""
+    scheduler.SCHEDULER = scheduler.Scheduler(
+        rate=1e9, burst=10**9, max_queue=10**9, max_wait=60
+    )
@@ -0,0 +1,86 @@
+"""
+Usage data inserts/s through the buffered USAGE_WRITER, against looking up
+the opted out user and saving every entry on its own as before, on a local
+mongod (skipped without one, see mongo.py).
+
+    python -m benchmarks.usage_writer [--events 20000] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+from typing import Awaitable, Callable, List
+from benchmarks import mongo
+from benchmarks.common import report
+from tiktoker.db.models import OptedOut, UsageData
+from tiktoker.utils import USAGE_WRITER, insert_usage_data, load_opted_out
+
+
+async def insert_usage_data_before(
+    guild_id: int, user_id: int, video_id: int, message_id: int
+) -> None:
+    """What insert_usage_data did before the writer."""
+    if await OptedOut.find_one({"user_id": user_id}):
+        user_id = None
+        message_id = None
+    await UsageData(
+        guild_id=guild_id, user_id=user_id, video_id=video_id, message_id=message_id
+    ).save()
+
+
+async def insert(
+    events: int, concurrency: int, insert_one: Callable[..., Awaitable[None]]
+) -> List[float]:
+    """Inserts from `concurrency` tasks, like messages being handled at once."""
+    latencies = []
+
+    async def worker(offset: int) -> None:
+        for event in range(offset, events, concurrency):
+            started = perf_counter()
+            await insert_one(event % 500, event % 5000, 7068971038273423621, event)
+            latencies.append(perf_counter() - started)
+
+    await asyncio.gather(*[worker(offset) for offset in range(concurrency)])
+    return latencies
+
+
+async def run(args: argparse.Namespace) -> None:
+    if (database := await mongo.connect()) is None:
+        return
+    try:
+        await OptedOut.insert_many([OptedOut(user_id=user_id) for user_id in range(50)])
+        await load_opted_out()
+
+        started = perf_counter()
+        latencies = await insert(
+            args.events, args.concurrency, insert_usage_data_before
+        )
+        seconds = perf_counter() - started
+        print(f"before: {args.events / seconds:,.0f} inserts/s")
+        report("before, response path", latencies)
+
+        started = perf_counter()
+        latencies = await insert(args.events, args.concurrency, insert_usage_data)
+        await USAGE_WRITER.close()  # everything written
+        seconds = perf_counter() - started
+        # entries past the queue's max are dropped, they don't count
+        print(f"usage writer: {USAGE_WRITER.written / seconds:,.0f} inserts/s")
+        report("usage writer, response path", latencies)
+        print(f"usage writer: {USAGE_WRITER.stats()}")
+
+        written = await UsageData.find_all().count()
+        print(f"{written} of {args.events * 2} entries written")
+    finally:
+        await mongo.drop(database)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
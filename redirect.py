@@ -0,0 +1,26 @@
+from dotenv import get_key
+import asyncio
+
+
+async def serve() -> None:
+    from tiktoker.db import init
+    from tiktoker.utils import redirect
+
+    await init(
+        host=get_key(".env", "HOST"),
+        username=get_key(".env", "USERNAME"),
+        password=get_key(".env", "PASSWORD"),
+        port=int(get_key(".env", "PORT")),
+    )
+    host = get_key(".env", "REDIRECT_HOST") or "0.0.0.0"
+    port = int(get_key(".env", "REDIRECT_PORT") or 8080)
+    await redirect.start(host, port)
+    print(f"Serving redirects on {host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await redirect.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
@@ -1,5 +1,45 @@
-from tiktoker import run
+from os import environ
+from dotenv import get_key
 import asyncio
+import multiprocessing
+import time
+
+
+def parse_shard_ids(value: str) -> list:
+    """Parses a shard id range, e.g. "0-3" or "0,2,4" """
+    shard_ids = []
+    for part in value.split(","):
+        if "-" in part:
+            start, end = part.split("-")
+            shard_ids.extend(range(int(start), int(end) + 1))
+        else:
+            shard_ids.append(int(part))
+    return shard_ids
+
+
+def start(shard_id: int = None) -> None:
+    if shard_id is not None:
+        environ["SHARD_ID"] = str(shard_id)  # read when tiktoker is imported
+    from tiktoker import run
 
-if __name__ == "__main__":
     asyncio.run(run())
+
+
+if __name__ == "__main__":
+    shard_ids = parse_shard_ids(
+        environ.get("SHARD_IDS") or get_key(".env", "SHARD_IDS") or "0"
+    )
+    if len(shard_ids) == 1:
+        start(shard_ids[0])
+    else:
+        # one process per shard, a dis_snek client runs a single shard,
+        # spawned so each imports tiktoker fresh
+        context = multiprocessing.get_context("spawn")
+        processes = []
+        for shard_id in shard_ids:
+            process = context.Process(target=start, args=(shard_id,))
+            process.start()
+            processes.append(process)
+            time.sleep(5)  # Discord allows one identify every 5 seconds
+        for process in processes:
+            process.join()
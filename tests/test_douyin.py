@@ -0,0 +1,100 @@
+"""the Douyin listener helpers"""
+
+import asyncio
+import pytest
+from tiktoker.models import LinkData, VideoIdType
+from tiktoker.scales import douyin
+from tiktoker.utils.scheduler import Shed
+
+SHORT_LINK = LinkData(
+    VideoIdType.DOUYIN_SHORT, "NeXy7Ab", "https://v.douyin.com/NeXy7Ab", True
+)
+LONG_LINK = LinkData(
+    VideoIdType.DOUYIN_LONG,
+    "7068971038273423621",
+    "https://www.douyin.com/video/7068971038273423621",
+    True,
+)
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    fetched = []
+
+    async def get_douyin_data(url):
+        fetched.append(url)
+        return {"url": url}
+
+    monkeypatch.setattr(douyin, "get_douyin_data", get_douyin_data)
+    return fetched
+
+
+def resolve_to(monkeypatch, result):
+    async def get_video_id(link):
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(douyin, "get_video_id", get_video_id)
+
+
+def test_short_link_is_fetched_from_the_video_page(monkeypatch, fetched):
+    resolve_to(monkeypatch, 7068971038273423621)
+    asyncio.run(douyin.Douyin.get_video_data(None, SHORT_LINK))
+    assert fetched == ["https://www.douyin.com/video/7068971038273423621"]
+
+
+def test_long_link_is_fetched_as_is(monkeypatch, fetched):
+    resolve_to(monkeypatch, AssertionError("long links aren't resolved"))
+    asyncio.run(douyin.Douyin.get_video_data(None, LONG_LINK))
+    assert fetched == [LONG_LINK.url]
+
+
+@pytest.mark.parametrize("result", [None, ValueError("no redirect")])
+def test_unresolved_short_link_is_fetched_as_is(monkeypatch, fetched, result):
+    resolve_to(monkeypatch, result)
+    asyncio.run(douyin.Douyin.get_video_data(None, SHORT_LINK))
+    assert fetched == [SHORT_LINK.url]
+
+
+def test_shed_resolve_is_not_fetched(monkeypatch, fetched):
+    resolve_to(monkeypatch, Shed("Too many requests waiting"))
+    with pytest.raises(Shed):
+        asyncio.run(douyin.Douyin.get_video_data(None, SHORT_LINK))
+    assert fetched == []
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class FakeSession:
+    def __init__(self):
+        self.urls = []
+
+    def request(self, method, url, **kwargs):
+        assert method == "HEAD"
+        self.urls.append(url)
+        if url == "https://m.tiktoker.win/abcdefgh":
+            return FakeResponse({"location": "https://cdn.example/video.mp4"})
+        return FakeResponse({"content-length": "1234"})
+
+
+def test_get_video_size(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(douyin, "request", session.request)
+    size = asyncio.run(
+        douyin.Douyin.get_video_size(None, "https://m.tiktoker.win/abcdefgh")
+    )
+    assert size == "1234"
+    assert session.urls == [
+        "https://m.tiktoker.win/abcdefgh",
+        "https://cdn.example/video.mp4",
+    ]
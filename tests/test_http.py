@@ -0,0 +1,33 @@
+"""decoding upstream json"""
+
+import asyncio
+import pytest
+from tiktoker.utils.http import read_json
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def read(self) -> bytes:
+        return self.body
+
+
+@pytest.mark.parametrize("body", [b"", b"  \n"])
+def test_empty_body_is_none(body):
+    assert asyncio.run(read_json(FakeResponse(body))) is None
+
+
+def test_fields_are_selected():
+    body = b'{"status_code": 0, "aweme_detail": {"desc": "hi", "big": [1, 2]}}'
+    data = asyncio.run(
+        read_json(
+            FakeResponse(body), {"status_code": None, "aweme_detail": {"desc": None}}
+        )
+    )
+    assert data == {"status_code": 0, "aweme_detail": {"desc": "hi"}}
+
+
+def test_invalid_json_raises_value_error():
+    with pytest.raises(ValueError):
+        asyncio.run(read_json(FakeResponse(b"<html>")))
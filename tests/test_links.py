@@ -0,0 +1,93 @@
+"""check_for_link matches what checking each pattern on its own did"""
+
+import random
+import re
+import pytest
+from tiktoker.models import LinkData, VideoIdType
+from tiktoker.utils import LINK_PATTERNS, check_for_link, find_all_links
+
+LINKS = [
+    "https://www.tiktok.com/@placeholder/video/7068971038273423621",
+    "http://www.tiktok.com/@a.b_c/video/706897103827342362",
+    "tiktok.com/@x/video/123456789012345678",
+    "https://vm.tiktok.com/PTPdh1wVay/",
+    "vm.tiktok.com/ZMabcdef/",
+    "www.tiktok.com/t/ZTRabc123/",
+    "https://m.tiktok.com/v/7068971038273423621.html",
+    "https://www.tiktok.com/foryou?_r=1&is_from_webapp=v1&item_id=7068971038273423621&source=h5_m#/@yakmofo123/video/7068971038273423621",
+    "https://www.douyin.com/video/7068971038273423621",
+    "https://v.douyin.com/NeXy7Ab/",
+]
+WORDS = "hey lol did you see this the chinese one https://youtube.com/watch?v=abc gg".split()
+
+MESSAGES = [
+    "",
+    "no links here",
+    "tiktok but no link",
+    "douyin.com",
+    *LINKS,
+    " ".join(LINKS),
+    " ".join(reversed(LINKS)),
+    # overlapping matches, the lower priority one starts first
+    "vm.tiktok.com/ZMabcdef/ https://www.tiktok.com/@placeholder/video/7068971038273423621",
+    "https://www.tiktok.com/foryou?item_id=12345 https://m.tiktok.com/v/7068971038273423621",
+    "https://www.tiktok.com/@a/video/7068971038273423621?item_id=123456",
+    "see https://v.douyin.com/NeXy7Ab/ and https://vm.tiktok.com/PTPdh1wVay/",
+    "https://www.douyin.com/video/7068971038273423621 www.tiktok.com/t/ZTRabc123/",
+    "xxxxxxxxxxxxxxxxhttps://www.tiktok.com/@placeholder/video/7068971038273423621",
+    "https://vm.tiktok.com/PTPdh1wVay/https://m.tiktok.com/v/7068971038273423621",
+]
+
+
+def reference_check_for_link(content: str):
+    """The patterns checked one by one, in order of priority."""
+    for video_id_type, pattern in LINK_PATTERNS.items():
+        if match := re.search(pattern, content):
+            name = video_id_type.name
+            url = match.group(0)
+            if not match.group(f"{name}_http"):
+                url = f"https://{url}"
+            return LinkData.from_list(
+                [
+                    video_id_type,
+                    match.group(f"{name}_id"),
+                    url,
+                    name.startswith("DOUYIN"),
+                ]
+            )
+    return None
+
+
+def generated_messages(count: int):
+    generator = random.Random(0)
+    for _ in range(count):
+        words = [generator.choice(WORDS) for _ in range(generator.randint(1, 20))]
+        for _ in range(generator.randint(0, 3)):
+            words.insert(generator.randint(0, len(words)), generator.choice(LINKS))
+        separator = generator.choice([" ", "", "\n"])
+        yield separator.join(words)
+
+
+@pytest.mark.parametrize("content", MESSAGES)
+def test_check_for_link_matches_reference(content):
+    assert check_for_link(content) == reference_check_for_link(content)
+
+
+def test_check_for_link_matches_reference_generated():
+    for content in generated_messages(5000):
+        assert check_for_link(content) == reference_check_for_link(content), content
+
+
+def test_check_for_link_types():
+    assert check_for_link(LINKS[0]).type is VideoIdType.LONG
+    assert check_for_link(LINKS[3]).type is VideoIdType.SHORT
+    assert check_for_link(LINKS[6]).type is VideoIdType.MEDIUM
+    assert check_for_link(LINKS[7]).type is VideoIdType.FYP
+    assert check_for_link(LINKS[8]).douyin
+    assert check_for_link(LINKS[9]).type is VideoIdType.DOUYIN_SHORT
+    assert check_for_link(LINKS[4]).url == "https://vm.tiktok.com/ZMabcdef"
+
+
+def test_find_all_links_skips_duplicates():
+    links = find_all_links(f"{LINKS[0]} {LINKS[3]} {LINKS[0]}")
+    assert [link.type for link in links] == [VideoIdType.LONG, VideoIdType.SHORT]
@@ -0,0 +1,22 @@
+"""requests don't wait for their turn forever"""
+
+import asyncio
+import pytest
+from tiktoker.utils.scheduler import Priority, Scheduler, Shed
+
+
+def test_request_is_shed_after_max_wait():
+    scheduler = Scheduler(rate=1, burst=1, max_queue=10, max_wait=0.05)
+
+    async def main():
+        await scheduler.acquire("host", Priority.COMMAND)  # uses the burst
+        with pytest.raises(Shed):
+            await scheduler.acquire("host", Priority.COMMAND)
+        await asyncio.sleep(1)
+        await scheduler.acquire("host", Priority.COMMAND)  # the token is not lost
+
+    asyncio.run(main())
+    stats = scheduler.stats()["host"]
+    assert stats["timeouts"] == 1
+    assert stats["shed"] == 1
+    assert stats["granted"] == 2
@@ -0,0 +1,82 @@
+"""short urls are created once per video uri, even when spammed"""
+
+import asyncio
+import pytest
+from pymongo.errors import DuplicateKeyError
+from tiktoker import db
+from tiktoker.db.models import Shortener
+from tiktoker.utils.shortener import SHORT_URL_BASE, ShortUrls, make_slug
+
+
+class FakeCollection:
+    """The part of a motor collection ShortUrls uses, with unique indexes on
+    video_uri and slug."""
+
+    def __init__(self):
+        self.documents = []
+        self.calls = 0
+
+    async def find_one_and_update(
+        self, filter, update, upsert=False, return_document=None
+    ):
+        self.calls += 1
+        await asyncio.sleep(0.01)  # a round trip, so calls overlap
+        for document in self.documents:
+            if document["video_uri"] == filter["video_uri"]:
+                return document
+        document = {**filter, **update["$setOnInsert"]}
+        if any(other["slug"] == document["slug"] for other in self.documents):
+            raise DuplicateKeyError("slug")
+        self.documents.append(document)
+        return document
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(Shortener, "get_motor_collection", lambda: collection)
+    db.READY.set()
+    yield collection
+    db.READY.clear()
+
+
+def test_make_slug_is_deterministic():
+    assert make_slug("v0f044gc0000abc") == make_slug("v0f044gc0000abc")
+    assert make_slug("v0f044gc0000abc") != make_slug("v0f044gc0000abc", 1)
+    assert len(make_slug("v0f044gc0000abc")) == 8
+
+
+def test_spammed_link_creates_one_document(collection):
+    async def spam():
+        short_urls = ShortUrls()
+        return await asyncio.gather(
+            *[short_urls.get("v0f044gc0000abc") for _ in range(500)]
+        )
+
+    urls = asyncio.run(spam())
+
+    assert len(set(urls)) == 1
+    assert len(collection.documents) == 1
+    assert collection.calls == 1
+    assert urls[0] == collection.documents[0]["shortened_url"]
+
+
+def test_slug_collision_uses_the_next_attempt(collection):
+    collection.documents.append(
+        {"video_uri": "other", "slug": make_slug("uri"), "shortened_url": ""}
+    )
+
+    short_urls = ShortUrls()
+    url = asyncio.run(short_urls.get("uri"))
+
+    assert url == SHORT_URL_BASE + make_slug("uri", 1)
+    assert short_urls.collisions == 1
+    assert len(collection.documents) == 2
+
+
+def test_existing_uri_returns_the_saved_url(collection):
+    first = asyncio.run(ShortUrls().get("uri"))
+    second = asyncio.run(ShortUrls().get("uri"))  # a new process, empty index
+
+    assert first == second
+    assert len(collection.documents) == 1
@@ -0,0 +1,56 @@
+"""higher priority callers don't wait behind a lower priority call"""
+
+import asyncio
+from tiktoker.utils.scheduler import PRIORITY, Priority, Scheduler
+from tiktoker.utils.singleflight import SingleFlight
+
+
+def test_higher_priority_caller_overtakes_in_flight_call():
+    scheduler = Scheduler(rate=2, burst=1, max_queue=10)
+    flight = SingleFlight(prioritized=True)
+    fetched = []
+
+    async def fetch(tag):
+        await scheduler.acquire("host")
+        fetched.append(tag)
+        return tag
+
+    async def call(priority, tag):
+        PRIORITY.set(priority)
+        return await flight.do("video", fetch, tag)
+
+    async def main():
+        await scheduler.acquire("host", Priority.COMMAND)  # uses the burst
+        auto_embed = asyncio.create_task(call(Priority.AUTO_EMBED, "auto embed"))
+        await asyncio.sleep(0.01)
+        same = asyncio.create_task(call(Priority.AUTO_EMBED, "same"))
+        command = asyncio.create_task(call(Priority.COMMAND, "command"))
+        return await asyncio.gather(auto_embed, same, command)
+
+    assert asyncio.run(main()) == ["auto embed", "auto embed", "command"]
+    assert fetched == ["command", "auto embed"]
+    assert flight.stats()["overtaken"] == 1
+    assert flight.stats()["coalesced"] == 1
+
+
+def test_plain_flight_coalesces_every_priority():
+    flight = SingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(PRIORITY.get())
+        await asyncio.sleep(0.01)
+        return "config"
+
+    async def call(priority):
+        PRIORITY.set(priority)
+        return await flight.do("guild", load)
+
+    async def main():
+        first = asyncio.create_task(call(Priority.AUTO_EMBED))
+        await asyncio.sleep(0)
+        return await asyncio.gather(first, call(Priority.COMMAND))
+
+    assert asyncio.run(main()) == ["config", "config"]
+    assert calls == [Priority.AUTO_EMBED]
+    assert flight.stats()["overtaken"] == 0
@@ -0,0 +1,75 @@
+"""shard 0 only adds the usage data saved since its last refresh"""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from tiktoker.utils import stats
+from tiktoker.utils.stats import UsageStats
+
+
+class FakeUsageData:
+    entries = []
+    pipelines = []
+
+    @classmethod
+    def aggregate(cls, pipeline):
+        cls.pipelines.append(pipeline)
+        entry_time = pipeline[0]["$match"]["entry_time"]
+        entries = [
+            entry
+            for entry in cls.entries
+            if entry_time["$gt"] < entry.entry_time <= entry_time["$lte"]
+        ]
+        if "video_id" in pipeline[-1]["$group"]["_id"]:
+            buckets = {}
+            for entry in entries:
+                key = (entry.entry_time.strftime("%Y-%m-%dT%H"), entry.video_id)
+                buckets[key] = buckets.get(key, 0) + 1
+            results = [
+                {"_id": {"hour": hour, "video_id": video_id}, "count": count}
+                for (hour, video_id), count in buckets.items()
+            ]
+        else:
+            results = [{"_id": user_id} for user_id in {e.user_id for e in entries}]
+
+        async def iterate():
+            for result in results:
+                yield result
+
+        return iterate()
+
+
+def usage(minutes_ago, video_id, user_id):
+    return SimpleNamespace(
+        entry_time=datetime.utcnow() - timedelta(minutes=minutes_ago),
+        video_id=video_id,
+        user_id=user_id,
+    )
+
+
+def test_refresh_adds_what_other_shards_saved(monkeypatch):
+    monkeypatch.setattr(stats, "UsageData", FakeUsageData)
+    pipelines = []
+    monkeypatch.setattr(FakeUsageData, "pipelines", pipelines)
+    usage_stats = UsageStats()
+    usage_stats.incremental = usage_stats.loaded = True
+    counted_until = datetime.utcnow() - timedelta(minutes=10)
+    usage_stats.counted_until = counted_until
+
+    mine = usage(5, 1, 10)
+    usage_stats.record(mine)
+    unwritten = usage(0, 1, 10)
+    usage_stats.record(unwritten)
+    others = [usage(4, 1, 20), usage(3, 2, 30), usage(0, 2, 40)]
+    monkeypatch.setattr(FakeUsageData, "entries", [mine, *others])
+
+    asyncio.run(usage_stats.refresh())
+    assert usage_stats.total == 4  # mine and unwritten once, two from other shards
+    assert usage_stats.videos.most_common(2) == [(1, 3), (2, 1)]
+    assert usage_stats.unique_users == 3
+    assert usage_stats._recorded == [(unwritten.entry_time, 1)]
+    # only the new usage data is read, and the next refresh starts after it
+    assert [pipeline[0]["$match"]["entry_time"]["$gt"] for pipeline in pipelines] == [
+        counted_until
+    ] * 2
+    assert usage_stats.counted_until > mine.entry_time
@@ -0,0 +1,37 @@
+"""the TikTok auto embed listener"""
+
+import asyncio
+from types import SimpleNamespace
+import pytest
+from tiktoker.scales import tiktok
+
+MESSAGE = SimpleNamespace(
+    author=SimpleNamespace(id=1),
+    content="https://www.tiktok.com/@user/video/7068971038273423621",
+    guild=SimpleNamespace(id=2),
+)
+
+
+def test_links_are_not_resolved_when_the_config_fails(monkeypatch):
+    async def get_guild_config(guild_id):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database is down")
+
+    resolving = []
+
+    async def convert_links(links):
+        resolving.append(asyncio.current_task())
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(tiktok, "get_guild_config", get_guild_config)
+    scale = SimpleNamespace(
+        bot=SimpleNamespace(user=SimpleNamespace(id=0)), convert_links=convert_links
+    )
+    event = SimpleNamespace(message=MESSAGE)
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await tiktok.TikTok.on_message_create(scale, event)
+        return resolving[0].done()
+
+    assert asyncio.run(main())
@@ -1,30 +1,110 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import dis_snek as dis
 from dotenv import get_key
 import tiktoker.utils as utils
-from pyppeteer import launch
-from tiktoker.db import init
+from tiktoker.utils import http
+from tiktoker.utils import metrics
+from tiktoker.utils import redirect
+from tiktoker.utils import scheduler
+from tiktoker.utils import shards
+from tiktoker.utils.browser import PAGES
+from tiktoker.utils.startup import Startup
+from tiktoker.utils.translate import load_all as load_translations
+from tiktoker.db import init, READY as DB_READY
 
 tiktoker = dis.Snake(
     intents=dis.Intents.MESSAGES | dis.Intents.DEFAULT,
-    sync_interactions=True,
+    sync_interactions=shards.SHARD_ID == 0,  # commands are global, sync them once
+    shard_id=shards.SHARD_ID,
+    total_shards=shards.TOTAL_SHARDS,
     delete_unused_application_cmds=False,  # this is a bit buggy on restarts
 )
 
-BROWSER = None
+
+async def init_database(startup: "Startup") -> None:
+    await startup.stage(
+        "database",
+        init(
+            host=get_key(".env", "HOST"),
+            username=get_key(".env", "USERNAME"),
+            password=get_key(".env", "PASSWORD"),
+            port=int(get_key(".env", "PORT")),
+        ),
+    )
+    await startup.gather(
+        opted_out=utils.load_opted_out(), usage_stats=utils.get_usage_stats()
+    )
 
 
 async def run() -> None:
-    global BROWSER
-    BROWSER = await launch(headless=True)
-
-    await init(
-        host=get_key(".env", "HOST"),
-        username=get_key(".env", "USERNAME"),
-        password=get_key(".env", "PASSWORD"),
-        port=int(get_key(".env", "PORT")),
+    startup = Startup()
+    # only shard 0 counts the usage stats, the others load its snapshot
+    utils.USAGE_STATS.from_snapshot = shards.SHARD_ID != 0
+    utils.USAGE_STATS.incremental = shards.SHARD_ID == 0 and shards.TOTAL_SHARDS > 1
+    PAGES.idle_timeout = float(get_key(".env", "BROWSER_IDLE_TIMEOUT") or 300)
+    if get_key(".env", "BROWSER_PREWARM") == "true":
+        utils.run_in_background(startup.stage("browser", PAGES.start()))
+
+    scheduler.SCHEDULER.rate = float(get_key(".env", "UPSTREAM_RATE") or 10)
+    scheduler.SCHEDULER.burst = int(get_key(".env", "UPSTREAM_BURST") or 20)
+    scheduler.SCHEDULER.max_queue = int(get_key(".env", "UPSTREAM_MAX_QUEUE") or 200)
+    scheduler.SCHEDULER.max_wait = float(get_key(".env", "UPSTREAM_MAX_WAIT") or 5)
+
+    # events that arrive before the database is ready wait for it
+    database = asyncio.create_task(init_database(startup))
+    await startup.gather(
+        http=http.init(
+            timeout=float(get_key(".env", "HTTP_TIMEOUT") or 10),
+            limit_per_host=int(get_key(".env", "HTTP_LIMIT_PER_HOST") or 20),
+        ),
+        translations=asyncio.to_thread(load_translations),
     )
+    if redirect_port := get_key(".env", "REDIRECT_PORT"):
+        await startup.stage(
+            "redirect",
+            redirect.start(
+                get_key(".env", "REDIRECT_HOST") or "0.0.0.0", int(redirect_port)
+            ),
+        )
+    if parse_workers := int(get_key(".env", "PARSE_WORKERS") or 0):
+        if get_key(".env", "PARSE_EXECUTOR") == "process":
+            utils.PARSE_EXECUTOR = ProcessPoolExecutor(
+                parse_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            utils.PARSE_EXECUTOR = ThreadPoolExecutor(parse_workers)
     for scale in utils.get_scales("./tiktoker/scales/"):
         tiktoker.grow_scale(scale)
 
-    await tiktoker.login(get_key(".env", "TOKEN"))
-    await tiktoker.start_gateway()
+    gateway = None
+    loops = []
+    try:
+        await startup.stage("login", tiktoker.login(get_key(".env", "TOKEN")))
+        gateway = asyncio.create_task(tiktoker.start_gateway())
+        await database
+        print(f"Startup: shard {shards.SHARD_ID} ready in {startup.elapsed:.2f}s")
+        loops.append(asyncio.create_task(shards.coordinate(tiktoker)))
+        loops.append(
+            asyncio.create_task(
+                metrics.log_stats_periodically(
+                    float(get_key(".env", "STATS_LOG_INTERVAL") or metrics.LOG_INTERVAL)
+                )
+            )
+        )
+        await gateway
+    finally:
+        if gateway is not None and not gateway.done():
+            await tiktoker.stop()
+        for loop in loops:
+            loop.cancel()
+        await utils.drain_background_tasks()  # may queue usage data
+        if DB_READY.is_set():
+            await utils.USAGE_WRITER.close()
+        metrics.log_stats()
+        await redirect.stop()
+        await http.close()
+        await PAGES.close()
+        if utils.PARSE_EXECUTOR is not None:
+            utils.PARSE_EXECUTOR.shutdown()
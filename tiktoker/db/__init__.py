@@ -1,3 +1,5 @@
+import asyncio
+from functools import wraps
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
 from tiktoker.db.models import __beanie_models__
@@ -6,6 +8,8 @@ from tiktoker.db.models.usage_data import UsageData
 
 CLIENT = None
 TIKTOKERDB = None
+READY = asyncio.Event()
+"""Set once `init` is done, until then `requires_db` functions wait for it."""
 
 
 async def init(host: str, username: str, password: str, port: int) -> None:
@@ -16,3 +20,15 @@ async def init(host: str, username: str, password: str, port: int) -> None:
     )
     TIKTOKERDB = CLIENT.tiktoker
     await init_beanie(database=TIKTOKERDB, document_models=__beanie_models__)
+    READY.set()
+
+
+def requires_db(func):
+    """Makes calls made while the database is starting up wait for it."""
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        await READY.wait()
+        return await func(*args, **kwargs)
+
+    return wrapper
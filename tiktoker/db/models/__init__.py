@@ -4,6 +4,16 @@ from .config import Config
 from .usage_data import UsageData
 from .shortener import Shortener
 from .opted_out import OptedOut
+from .shard_status import ShardStatus
+from .short_link import ShortLink
+from .usage_snapshot import UsageSnapshot
 
-
-__beanie_models__ = [Config, UsageData, Shortener, OptedOut]
+__beanie_models__ = [
+    Config,
+    UsageData,
+    Shortener,
+    OptedOut,
+    ShardStatus,
+    ShortLink,
+    UsageSnapshot,
+]
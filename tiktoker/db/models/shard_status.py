@@ -0,0 +1,11 @@
+from datetime import datetime
+from beanie import Document, Indexed
+from pydantic.fields import Field
+
+
+class ShardStatus(Document):
+    """Shard Status Model"""
+
+    shard_id: Indexed(int, unique=True)
+    guild_count: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
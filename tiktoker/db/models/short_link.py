@@ -0,0 +1,15 @@
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+
+
+class ShortLink(Document):
+    """Short Link Model"""
+
+    short_id: str
+    douyin: bool = False
+    video_id: int
+
+    class Settings:
+        indexes = [
+            IndexModel([("short_id", ASCENDING), ("douyin", ASCENDING)], unique=True),
+        ]
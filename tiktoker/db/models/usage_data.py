@@ -1,14 +1,20 @@
 from typing import Optional
-from beanie import Document
+from beanie import Document, Indexed
 from pydantic.fields import Field
 from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 
 class UsageData(Document):
     """Usage Data Model"""
 
     guild_id: int
-    user_id: Optional[int] = None
-    video_id: int
+    user_id: Optional[Indexed(int)] = None
+    video_id: Indexed(int)
     message_id: Optional[int] = None
-    entry_time: datetime = Field(default=datetime.utcnow())
+    entry_time: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        indexes = [
+            IndexModel([("guild_id", ASCENDING), ("entry_time", DESCENDING)]),
+        ]
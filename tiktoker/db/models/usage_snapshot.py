@@ -0,0 +1,14 @@
+from datetime import datetime
+from typing import Dict, List
+from beanie import Document
+from pydantic.fields import Field
+
+
+class UsageSnapshot(Document):
+    """Usage Snapshot Model, the usage stats shard 0 loaded last"""
+
+    total: int = 0
+    hourly: Dict[str, int] = {}  # "%Y-%m-%dT%H" -> conversions
+    users: bytes = b""  # HyperLogLog registers
+    videos: List[List[int]] = []  # [video_id, conversions]
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
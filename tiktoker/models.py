@@ -1,11 +1,10 @@
 import re
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 import attr
 from attr import define
 from dis_snek import Timestamp
-from dis_snek.client.mixins.serialization import DictSerializationMixin
 
 from dis_snek.client.utils.converters import timestamp_converter
 
@@ -46,11 +45,26 @@ class VideoIdType(Enum):
     DOUYIN_SHORT = 5  # https://www.douyin.com/share/video/7068971038273423621
 
 
-@attr.s()
-class TikTokObject(DictSerializationMixin):
+@attr.s(slots=True, frozen=True)
+class TikTokObject:
+    """
+    Slotted and frozen, cached objects are shared between callers.
+
+    Doesn't use DictSerializationMixin, as a base without __slots__ gives
+    every object a __dict__ too.
+    """
+
     @classmethod
     def _process_dict(cls, data: Dict[str, Any]) -> Dict[str, Any]:
-        return super()._process_dict(data)
+        return data
+
+    @classmethod
+    def _get_init_keys(cls) -> Set[str]:
+        return {field.name for field in attr.fields(cls) if field.init}
+
+    @classmethod
+    def _filter_kwargs(cls, data: Dict[str, Any], keys: Set[str]) -> Dict[str, Any]:
+        return {key: value for key, value in data.items() if key in keys}
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]):
@@ -68,14 +82,8 @@ class TikTokObject(DictSerializationMixin):
             for data in datas
         ]
 
-    def update_from_dict(self, data) -> None:
-        data = self._process_dict(data)
-        for key, value in self._filter_kwargs(data, self._get_keys()).items():
-            # todo improve
-            setattr(self, key, value)
-
 
-@define
+@define(frozen=True)
 class Video(TikTokObject):
     download_url: str = attr.ib()
     cover_url: str = attr.ib()
@@ -96,7 +104,7 @@ class Video(TikTokObject):
         return data
 
 
-@define
+@define(frozen=True)
 class Statistics(TikTokObject):
     play_count: int = attr.ib()
     like_count: int = attr.ib()
@@ -119,7 +127,7 @@ class Statistics(TikTokObject):
         return data
 
 
-@define
+@define(frozen=True)
 class Music(TikTokObject):
     id: int = attr.ib(converter=int)
     title: str = attr.ib()
@@ -151,7 +159,7 @@ class Music(TikTokObject):
         return data
 
 
-@define
+@define(frozen=True)
 class Author(TikTokObject):
     nickname: str = attr.ib()
     unique_id: str = attr.ib()
@@ -174,7 +182,7 @@ class Author(TikTokObject):
         return data
 
 
-@define
+@define(frozen=True)
 class Description(TikTokObject):
     raw: Optional[str] = attr.ib(default=None)
     cleaned: Optional[str] = attr.ib(default=None)
@@ -194,16 +202,21 @@ class Description(TikTokObject):
         return data
 
 
+WHITESPACE_REGEX = re.compile(r"\s+")
+
+
 def clean_desc(text_extra, desc) -> str:
-    for tag in text_extra:
-        if tag.get("type") == 1:
-            desc: str
-            desc = desc.lower().replace(f"#{tag.get('hashtag_name').lower()}", "", 1)
-            desc = re.sub(r"\s+", " ", desc)
+    tags = [tag for tag in text_extra if tag.get("type") == 1]
+    if tags:
+        desc: str
+        desc = desc.lower()
+        for tag in tags:
+            desc = desc.replace(f"#{tag.get('hashtag_name').lower()}", "", 1)
+        desc = WHITESPACE_REGEX.sub(" ", desc)
     return desc.strip()
 
 
-@define
+@define(frozen=True)
 class TikTokData(TikTokObject):
     id: str = attr.ib()
     video: "Video" = attr.ib()
@@ -238,3 +251,27 @@ class TikTokData(TikTokObject):
             data["author"] = Author.from_dict(author)
 
         return data
+
+
+_URL_LIST = {"url_list": None, "uri": None, "data_size": None}
+AWEME_DETAIL_FIELDS = {
+    "aweme_id": None,
+    "create_time": None,
+    "share_url": None,
+    "desc": None,
+    "text_extra": None,
+    "video": {"play_addr": _URL_LIST, "cover": _URL_LIST},
+    "statistics": None,
+    "music": {
+        "id": None,
+        "title": None,
+        "author": None,
+        "owner_nickname": None,
+        "owner_handle": None,
+        "play_url": _URL_LIST,
+        "cover_medium": _URL_LIST,
+        "avatar_thumb": _URL_LIST,
+    },
+    "author": {"nickname": None, "unique_id": None, "avatar_thumb": _URL_LIST},
+}
+"""The parts of an aweme_detail TikTokData reads, see `select_fields`"""
@@ -1,18 +1,19 @@
-import aiohttp
 import dis_snek as dis
 from tiktoker.utils import (
     check_for_link,
     create_short_url,
+    get_douyin_data,
     get_guild_config,
+    get_video_id,
     insert_usage_data,
 )
+from tiktoker.models import LinkData, VideoIdType
+from tiktoker.utils.browser import USER_AGENT as user_agent
+from tiktoker.utils.http import request
+from tiktoker.utils.scheduler import PRIORITY, Priority, Shed
 from tiktoker.utils.translate import load_lang
-from tiktoker import BROWSER
-import json
-import urllib.parse
 
 _ = load_lang("douyin")
-user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/61.0.3163.100 Safari/537.36"
 
 
 class Douyin(dis.Scale):
@@ -26,16 +27,14 @@ class Douyin(dis.Scale):
         link = check_for_link(event.message.content)
         if not link or not link.douyin:
             return
+        PRIORITY.set(Priority.AUTO_EMBED)
 
         await event.message.channel.trigger_typing()
-        page = await BROWSER.newPage()
-        await page.setUserAgent(user_agent)
-        await page.goto(link.url)
-        element = await page.querySelector("#RENDER_DATA")
-        video_data = await page.evaluate("(element) => element.innerText", element)
-        await page.close()
-        decoded = urllib.parse.unquote(video_data)
-        video_data = json.loads(decoded)
+        try:
+            video_data = await self.get_video_data(link)
+        except Shed as e:  # upstream is saturated, skip the auto embed
+            print(f"Note: skipped {link.url}: {e}")
+            return
         long_video_id = video_data["32"]["aweme"]["detail"]["video"]["playApi"]
         video_id = video_data["32"]["awemeId"]
         long_video_id = (
@@ -51,13 +50,11 @@ class Douyin(dis.Scale):
         too_big = False
         config = await get_guild_config(event.message.guild.id)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.head(
-                short_url, allow_redirects=True, headers={"user-agent": user_agent}
-            ) as response:
-                video_url = response.headers.get("location")
-            async with session.head(video_url, allow_redirects=True) as response:
-                video_size = response.headers.get("content-length")
+        try:
+            video_size = await self.get_video_size(short_url)
+        except Shed as e:
+            print(f"Note: skipped {link.url}: {e}")
+            return
 
         if int(video_size) > 50000000:  # 50mb | This is Discord's limit for embeds
             too_big = _[config.language].gettext(
@@ -97,6 +94,44 @@ class Douyin(dis.Scale):
             event.message.guild.id, event.message.author.id, video_id, sent_msg.id
         )
 
+    async def get_video_data(self, link: "LinkData") -> dict:
+        """
+        Gets the RENDER_DATA of a Douyin link.
+
+        args:
+            link: The link.
+
+        returns:
+            The decoded RENDER_DATA.
+        """
+        url = link.url
+        if link.type == VideoIdType.DOUYIN_SHORT:
+            try:
+                if video_id := await get_video_id(link):  # skips the redirect
+                    url = f"https://www.douyin.com/video/{video_id}"
+            except Shed:
+                raise
+            except Exception as e:  # the browser follows the redirect instead
+                print(f"Note: unable to resolve {link.url}: {e}")
+        return await get_douyin_data(url)
+
+    async def get_video_size(self, short_url: str) -> str:
+        """
+        Gets the size of the video a short url redirects to.
+
+        args:
+            short_url: The short url.
+
+        returns:
+            The content-length, in bytes.
+        """
+        async with request(
+            "HEAD", short_url, allow_redirects=True, headers={"user-agent": user_agent}
+        ) as response:
+            video_url = response.headers.get("location")
+        async with request("HEAD", video_url, allow_redirects=True) as response:
+            return response.headers.get("content-length")
+
 
 def setup(bot: dis.Snake):
     Douyin(bot)
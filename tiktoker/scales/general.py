@@ -1,109 +1,122 @@
 """ General Scale """
 
 import subprocess
-from datetime import datetime, timedelta
-from collections import Counter
+from typing import List
 import dis_snek as dis
 from tiktoker.utils import (
     add_opted_out,
-    get_all_usage_data,
+    get_usage_stats,
     get_tiktok,
     remove_opted_out,
     remove_usage_data,
+    edit_guild_config,
+    forget_guild_config,
     get_guild_config,
     get_opted_out,
 )
-from tiktoker.utils.translate import load_lang, language_names as lang_names
+from tiktoker.utils.scheduler import PRIORITY, Priority
+from tiktoker.utils.shards import get_total_guild_count
+from tiktoker.utils.translate import (
+    DEFAULT_LANGUAGE,
+    load_lang,
+    language_names as lang_names,
+)
 from dis_snek.ext.paginators import Paginator
 
 _ = load_lang("general")
 
 
+def help_embeds(language: str) -> List["dis.Embed"]:
+    """The /help pages, they are static so they are built once per language"""
+    return [
+        dis.Embed(
+            title=_[language].gettext("What is TikToker?"),
+            description=_[language].gettext(
+                "Tiktoker is a bot that allows you to send playable TikTok videos to your Discord server."
+            ),
+            color="#00FFF0",
+            fields=[
+                dis.EmbedField(
+                    _[language].gettext("Help Menu"),
+                    _[language].gettext(
+                        "Click the arrow buttons below to navigate the help menu."
+                    ),
+                ).to_dict(),
+            ],
+        ),
+        dis.Embed(
+            _[language].gettext("Server Configuration"),
+            _[language].gettext(
+                "You may view the configuration of your server with `/config`.\nTo edit the config use, `/config <option>`.\nExample: `/config delete_origin:True`"
+            ),
+            color="#00FFF0",
+            fields=[
+                dis.EmbedField(
+                    "Auto Embed",
+                    _[language].gettext(
+                        "If enabled, the bot will automatically embed the Tiktok links."
+                    ),
+                ).to_dict(),
+                dis.EmbedField(
+                    "Delete Origin",
+                    _[language].gettext(
+                        "If enabled and _Auto Embed_ is enabled, the bot will delete the origin message containing the TikTok link."
+                    ),
+                ).to_dict(),
+                dis.EmbedField(
+                    "Suppress Origin Embed",
+                    _[language].gettext(
+                        "If enabled, the origin embed will be removed."
+                    ),
+                ).to_dict(),
+                dis.EmbedField(
+                    "Language",
+                    _[language].gettext("Set the language of the bot. "),
+                ).to_dict(),
+            ],
+        ),
+        dis.Embed(
+            _[language].gettext("Commands"),
+            _[language].gettext("Here are some commands to interact with the bot."),
+            color="#00FFF0",
+            fields=[
+                dis.EmbedField(
+                    "Convert 📸",
+                    _[language].gettext(
+                        "To use, right-click a message, go to `Apps > Convert %s`. Useful for when _Auto Embed_ is disabled in your server's configuration."
+                    )
+                    % "📸",
+                ).to_dict(),
+                dis.EmbedField(
+                    "/tiktok",
+                    _[language].gettext(
+                        "A slash command that takes a TikTok link and returns the video. Useful for when _Auto Embed_ is disabled in your server's configuration."
+                    ),
+                ).to_dict(),
+                dis.EmbedField(
+                    "/info",
+                    _[language].gettext(
+                        "Provides some general information and statistics about TikToker."
+                    ),
+                ).to_dict(),
+            ],
+        ),
+    ]
+
+
 class General(dis.Scale):
     """General commands and stuff"""
 
     def __init__(self, bot: dis.Snake):
         self.bot = bot
+        self.help_embeds = {language: help_embeds(language) for language in _}
 
     @dis.slash_command("help", "All the help you need")
     async def help(self, ctx: dis.InteractionContext):
         config = await get_guild_config(ctx.guild.id)
-        embeds = [
-            dis.Embed(
-                title=_[config.language].gettext("What is TikToker?"),
-                description=_[config.language].gettext(
-                    "Tiktoker is a bot that allows you to send playable TikTok videos to your Discord server."
-                ),
-                color="#00FFF0",
-                fields=[
-                    dis.EmbedField(
-                        _[config.language].gettext("Help Menu"),
-                        _[config.language].gettext(
-                            "Click the arrow buttons below to navigate the help menu."
-                        ),
-                    ).to_dict(),
-                ],
-            ),
-            dis.Embed(
-                _[config.language].gettext("Server Configuration"),
-                _[config.language].gettext(
-                    "You may view the configuration of your server with `/config`.\nTo edit the config use, `/config <option>`.\nExample: `/config delete_origin:True`"
-                ),
-                color="#00FFF0",
-                fields=[
-                    dis.EmbedField(
-                        "Auto Embed",
-                        _[config.language].gettext(
-                            "If enabled, the bot will automatically embed the Tiktok links."
-                        ),
-                    ).to_dict(),
-                    dis.EmbedField(
-                        "Delete Origin",
-                        _[config.language].gettext(
-                            "If enabled and _Auto Embed_ is enabled, the bot will delete the origin message containing the TikTok link."
-                        ),
-                    ).to_dict(),
-                    dis.EmbedField(
-                        "Suppress Origin Embed",
-                        _[config.language].gettext(
-                            "If enabled, the origin embed will be removed."
-                        ),
-                    ).to_dict(),
-                    dis.EmbedField(
-                        "Language",
-                        _[config.language].gettext("Set the language of the bot. "),
-                    ).to_dict(),
-                ],
-            ),
-            dis.Embed(
-                _[config.language].gettext("Commands"),
-                _[config.language].gettext(
-                    "Here are some commands to interact with the bot."
-                ),
-                color="#00FFF0",
-                fields=[
-                    dis.EmbedField(
-                        "Convert 📸",
-                        _[config.language].gettext(
-                            "To use, right-click a message, go to `Apps > Convert %s`. Useful for when _Auto Embed_ is disabled in your server's configuration."
-                        )
-                        % "📸",
-                    ).to_dict(),
-                    dis.EmbedField(
-                        "/tiktok",
-                        _[config.language].gettext(
-                            "A slash command that takes a TikTok link and returns the video. Useful for when _Auto Embed_ is disabled in your server's configuration."
-                        ),
-                    ).to_dict(),
-                    dis.EmbedField(
-                        "/info",
-                        _[config.language].gettext(
-                            "Provides some general information and statistics about TikToker."
-                        ),
-                    ).to_dict(),
-                ],
-            ),
-        ]
+        embeds = (
+            self.help_embeds.get(config.language) or self.help_embeds[DEFAULT_LANGUAGE]
+        )
 
         paginator = Paginator.create_from_embeds(self.bot, *embeds, timeout=30)
         paginator.default_button_color = dis.ButtonStyles.GRAY
@@ -265,16 +278,17 @@ class General(dis.Scale):
             await ctx.send(embed=embed)
             return
 
+        changes = {}
         if auto_embed is not None:
-            config.auto_embed = auto_embed
+            changes["auto_embed"] = auto_embed
         if delete_origin is not None:
-            config.delete_origin = delete_origin
+            changes["delete_origin"] = delete_origin
         if suppress_origin_embed is not None:
-            config.suppress_origin_embed = suppress_origin_embed
+            changes["suppress_origin_embed"] = suppress_origin_embed
         if language is not None:
-            config.language = language
+            changes["language"] = language
 
-        await config.save()
+        config = await edit_guild_config(guild_id, **changes)
 
         embed = dis.Embed(
             _[config.language].gettext("Current Config"),
@@ -294,28 +308,24 @@ class General(dis.Scale):
         embed.add_field("Language", config.language, inline=True)
         await ctx.send(embed=embed)
 
+    @dis.listen(dis.events.GuildLeft)
+    async def on_guild_left(self, event: dis.events.GuildLeft):
+        forget_guild_config(event.guild_id)
+
     @dis.slash_command(
         "info", "Here is some general information and statistics about TikToker."
     )
     @dis.cooldown(dis.Buckets.GUILD, 1, 10)
     async def info(self, ctx: dis.Context):
+        PRIORITY.set(Priority.COMMAND)
         await ctx.defer()
 
         config = await get_guild_config(ctx.guild.id)
-        usage_data = await get_all_usage_data()
-
-        unique_users = len(set([x.user_id for x in usage_data if x.user_id]))
-        total_converted_today = len(
-            [
-                x
-                for x in usage_data
-                if x.entry_time > (datetime.now() - timedelta(days=1))
-            ]
-        )
+        usage_stats = await get_usage_stats()
 
-        most_popular_video_id = Counter([x.video_id for x in usage_data]).most_common(
-            1
-        )[0][0]
+        unique_users = usage_stats.unique_users
+        total_converted_today = usage_stats.today
+        most_popular_video_id = usage_stats.most_popular_video_id
         commit = (
             subprocess.check_output(["git", "rev-parse", "--short", "HEAD"])
             .decode("utf-8")
@@ -340,7 +350,7 @@ class General(dis.Scale):
         )
         embed.add_field(
             name=_[config.language].gettext("TikToks Converted %s") % "📷",
-            value=len(usage_data),
+            value=usage_stats.total,
             inline=True,
         )
         embed.add_field(
@@ -355,7 +365,7 @@ class General(dis.Scale):
         )
         embed.add_field(
             name=_[config.language].gettext("Server Count %s") % "📡",
-            value=len(ctx.bot.guilds),
+            value=await get_total_guild_count(ctx.bot),
             inline=True,
         )
         embed.add_field(
@@ -1,17 +1,23 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
 import dis_snek as dis
-from tiktoker.models import TikTokData, VideoIdType
+from tiktoker.models import LinkData, TikTokData, VideoIdType
 from tiktoker.utils import (
     check_for_link,
     create_short_url,
+    find_all_links,
     get_guild_config,
     get_music_data,
     get_tiktok,
     get_video_id,
     insert_usage_data,
+    run_in_background,
 )
+from tiktoker.utils.scheduler import PRIORITY, Priority, Shed
 from tiktoker.utils.translate import load_lang
 
 _ = load_lang("tiktok")
+MAX_LINKS = 4  # one "Info" button each, plus the delete button, fills a row
 
 
 class TikTok(dis.Scale):
@@ -20,6 +26,7 @@ class TikTok(dis.Scale):
 
     @dis.context_menu("Convert 📸", dis.CommandTypes.MESSAGE)
     async def menu_convert_video(self, ctx: dis.InteractionContext):
+        PRIORITY.set(Priority.COMMAND)
         await ctx.defer()
         config = await get_guild_config(ctx.guild.id)
         link = check_for_link(ctx.target.content)
@@ -31,9 +38,17 @@ class TikTok(dis.Scale):
             return
 
         if link.type == VideoIdType.SHORT:
-            video_id = await get_video_id(link.url)
+            video_id = await get_video_id(link)
         else:
             video_id = link.id
+        if video_id is None:  # the short link doesn't redirect to a video
+            await ctx.send(
+                _[config.language].gettext(
+                    "That doesn't seem to be a valid TikTok link."
+                ),
+                ephemeral=True,
+            )
+            return
 
         try:
             tiktok = await get_tiktok(video_id)
@@ -75,6 +90,7 @@ class TikTok(dis.Scale):
         "link", "The TikTok link to convert.", dis.OptionTypes.STRING, True
     )
     async def slash_tiktok(self, ctx: dis.InteractionContext, link: str):
+        PRIORITY.set(Priority.COMMAND)
         config = await get_guild_config(ctx.guild.id)
         link = check_for_link(link)
         if not link or link.douyin:
@@ -87,9 +103,17 @@ class TikTok(dis.Scale):
             return
 
         if link.type == VideoIdType.SHORT:
-            video_id = await get_video_id(link.url)
+            video_id = await get_video_id(link)
         else:
             video_id = link.id
+        if video_id is None:  # the short link doesn't redirect to a video
+            await ctx.send(
+                _[config.language].gettext(
+                    "That doesn't seem to be a valid TikTok link."
+                ),
+                ephemeral=True,
+            )
+            return
 
         try:
             tiktok = await get_tiktok(video_id)
@@ -118,48 +142,77 @@ class TikTok(dis.Scale):
         sent_msg = await ctx.send(message, components=[more_info_btn, delete_msg_btn])
         await insert_usage_data(ctx.guild.id, ctx.author.id, video_id, sent_msg.id)
 
+    async def convert_link(
+        self, link: "LinkData"
+    ) -> Optional[Tuple[int, "TikTokData", str]]:
+        """
+        Resolves a link into its video.
+
+        args:
+            link: The link to convert.
+
+        returns:
+            The video id, the TikTok and its short url.
+        """
+        try:  # may be shed when upstream is saturated, see `scheduler`
+            if link.type == VideoIdType.SHORT:
+                video_id = await get_video_id(link)
+            else:
+                video_id = link.id
+            tiktok = await get_tiktok(video_id)
+        except Exception as e:
+            print(f"Error: {e}")
+            return None
+
+        return video_id, tiktok, await create_short_url(tiktok.video.video_uri)
+
     @dis.listen(dis.events.MessageCreate)
     async def on_message_create(self, event: dis.events.MessageCreate):
         if event.message.author.id == self.bot.user.id:
             return
         content = event.message.content
-        link = check_for_link(content)
-        if not link or link.douyin:
+        links = [link for link in find_all_links(content) if not link.douyin]
+        if not links:
             return
+        PRIORITY.set(Priority.AUTO_EMBED)
 
-        config = await get_guild_config(event.message.guild.id)
-
-        if not config.auto_embed:
-            return
-
-        await event.message.channel.trigger_typing()
-
-        if link.type == VideoIdType.SHORT:
-            video_id = await get_video_id(link.url)
-        else:
-            video_id = link.id
-
+        # the links are resolved while the config is looked up
+        config_task = asyncio.create_task(get_guild_config(event.message.guild.id))
+        conversions_task = asyncio.create_task(self.convert_links(links[:MAX_LINKS]))
         try:
-            tiktok = await get_tiktok(video_id)
-        except Exception as e:
-            print(f"Error: {e}")
-            return
+            config = await config_task
+            if not config.auto_embed:
+                return
 
-        short_url = await create_short_url(tiktok.video.video_uri)
+            typing = run_in_background(event.message.channel.trigger_typing())
+            conversions = await conversions_task
+        finally:
+            # a no-op once the links are resolved, otherwise nothing will use them
+            conversions_task.cancel()
+            await asyncio.gather(conversions_task, return_exceptions=True)
+        if not conversions:
+            typing.cancel()
+            return
 
-        more_info_btn = dis.Button(
-            dis.ButtonStyles.GRAY,
-            "Info",
-            "🌐",
-            custom_id=f"v_id{video_id}",
-        )
+        short_url = "\n".join(short_url for _, _, short_url in conversions.values())
+        info_btns = [
+            dis.Button(
+                dis.ButtonStyles.GRAY,
+                "Info" if len(conversions) == 1 else f"Info {number}",
+                "🌐",
+                custom_id=f"v_id{video_id}",
+            )
+            for number, video_id in enumerate(conversions, 1)
+        ]
         delete_msg_btn = dis.Button(
             dis.ButtonStyles.RED,
             emoji="🗑️",
             custom_id=f"delete{event.message.author.id}",
         )
         too_big = False
-        if tiktok.video.size > 50000000:  # 50mb | This is Discord's limit for embeds
+        if any(  # 50mb | This is Discord's limit for embeds
+            tiktok.video.size > 50000000 for _, tiktok, _ in conversions.values()
+        ):
             too_big = _[config.language].gettext(
                 "This video may be too long/big for Discord to embed. Just visit the link above."
             )
@@ -172,35 +225,77 @@ class TikTok(dis.Scale):
             )
             sent_msg = await event.message.channel.send(
                 message,
-                components=[more_info_btn, delete_msg_btn],
+                components=[*info_btns, delete_msg_btn],
                 allowed_mentions=dis.AllowedMentions.none(),
             )
-            try:
-                await event.message.delete()
-            except dis.errors.NotFound:
-                pass
+            # deleted off the response path, once the conversion is sent
+            run_in_background(self.delete_origin(event.message))
         elif config.suppress_origin_embed:
-            await event.message.suppress_embeds()
-            await self.bot.fetch_channel(event.message._channel_id)
             message = short_url + ("\n" + too_big if too_big else "")
-            sent_msg = await event.message.reply(
-                message, components=[more_info_btn, delete_msg_btn]
+            # a failed suppress (e.g. missing permissions) doesn't undo the reply
+            suppressed, sent_msg = await asyncio.gather(
+                event.message.suppress_embeds(),
+                event.message.reply(message, components=[*info_btns, delete_msg_btn]),
+                return_exceptions=True,
             )
+            if isinstance(sent_msg, BaseException):
+                raise sent_msg
+            if isinstance(suppressed, Exception):
+                print(f"Note: unable to suppress embeds: {suppressed}")
         else:
-            await self.bot.fetch_channel(event.message._channel_id)
             message = short_url + ("\n" + too_big if too_big else "")
             sent_msg = await event.message.reply(
-                message, components=[more_info_btn, delete_msg_btn]
+                message, components=[*info_btns, delete_msg_btn]
             )
 
-        await insert_usage_data(
-            event.message.guild.id, event.message.author.id, video_id, sent_msg.id
+        # the usage is recorded off the response path too
+        run_in_background(
+            self.record_usage(
+                event.message.guild.id,
+                event.message.author.id,
+                conversions,
+                sent_msg.id,
+            )
         )
 
+    async def convert_links(
+        self, links: List["LinkData"]
+    ) -> Dict[int, Tuple[int, "TikTokData", str]]:
+        """
+        Converts links concurrently.
+
+        args:
+            links: The links to convert.
+
+        returns:
+            video id -> the conversion, in the order of the links.
+        """
+        conversions = {}
+        for conversion in await asyncio.gather(
+            *[self.convert_link(link) for link in links]
+        ):
+            if conversion:  # a short and a long link can be the same video
+                conversions.setdefault(int(conversion[0]), conversion)
+        return conversions
+
+    async def delete_origin(self, message: "dis.Message") -> None:
+        """Deletes the message that was converted."""
+        try:
+            await message.delete()
+        except dis.errors.NotFound:
+            pass
+
+    async def record_usage(
+        self, guild_id: int, user_id: int, video_ids: Iterable[int], message_id: int
+    ) -> None:
+        """Records the usage of every converted video."""
+        for video_id in video_ids:
+            await insert_usage_data(guild_id, user_id, video_id, message_id)
+
     @dis.listen(dis.events.Button)
     async def on_button_click(self, event: dis.events.Button):
+        PRIORITY.set(Priority.BUTTON)
         ctx = event.context
-        config = await get_guild_config(ctx.guild.id)
         if ctx.custom_id.startswith("delete"):
             if dis.Permissions.MANAGE_MESSAGES in ctx.author.channel_permissions(
                 ctx.channel
@@ -209,6 +304,7 @@ class TikTok(dis.Scale):
             elif ctx.author.id == ctx.custom_id[6:]:
                 await ctx.delete()
             else:
+                config = await get_guild_config(ctx.guild.id)
                 await ctx.send(
                     _[config.language].gettext(
                         "You don't have the permissions to delete this message."
@@ -217,7 +313,12 @@ class TikTok(dis.Scale):
                 )
         elif ctx.custom_id.startswith("v_id"):
             await ctx.defer(ephemeral=True)
-            tiktok = await get_tiktok(int(ctx.custom_id[4:]))
+            config = await get_guild_config(ctx.guild.id)
+            try:
+                tiktok = await get_tiktok(int(ctx.custom_id[4:]), statistics=True)
+            except Exception as e:  # e.g. shed when upstream is saturated
+                await ctx.send(f"Error: {e}", ephemeral=True)
+                return
 
             video = tiktok.video
             author = tiktok.author
@@ -288,9 +389,13 @@ class TikTok(dis.Scale):
 
         elif ctx.custom_id.startswith("m_id"):  # TODO: Use aweme instead of music
             await ctx.defer(ephemeral=True)
+            config = await get_guild_config(ctx.guild.id)
 
             try:
                 tiktok = await get_tiktok(int(ctx.custom_id[4:]))
+            except Shed as e:
+                await ctx.send(f"Error: {e}", ephemeral=True)
+                return
             except Exception as e:
                 await ctx.send(
                     _[config.language].gettext(
@@ -306,7 +411,11 @@ class TikTok(dis.Scale):
                 url="https://www.tiktok.com/music/id-" + str(music.id),
             )
 
-            if extra_music_data := await get_music_data(music.id):
+            try:
+                extra_music_data = await get_music_data(music.id)
+            except Shed:  # the video count is optional
+                extra_music_data = None
+            if extra_music_data:
                 video_count = extra_music_data["musicInfo"]["stats"]["videoCount"]
                 embed.add_field(
                     name=_[config.language].gettext("Video Count %s") % "📱",
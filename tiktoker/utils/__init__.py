@@ -1,23 +1,122 @@
-from base64 import urlsafe_b64encode
-from typing import Optional, List
+import asyncio
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import Any, Awaitable, Dict, Optional, List, Set
 import aiohttp
-from tiktoker.db.models import Config, OptedOut, UsageData, Shortener
-from tiktoker.models import LinkData, VideoIdType, TikTokData
+from tiktoker.db.models import Config, OptedOut, ShortLink, UsageData
+from tiktoker.db import requires_db
+from tiktoker.models import AWEME_DETAIL_FIELDS, LinkData, VideoIdType, TikTokData
+from tiktoker.utils.browser import PAGES, USER_AGENT
+from tiktoker.utils.cache import TTLCache
+from tiktoker.utils.http import loads, read_json, request
+from tiktoker.utils.scheduler import Shed
+from tiktoker.utils.shortener import ShortUrls
+from tiktoker.utils.singleflight import SingleFlight
+from tiktoker.utils.stats import UsageStats
+from tiktoker.utils.usage_writer import UsageWriter
 import re
-from pymongo.errors import DuplicateKeyError
-from os import urandom, walk
+import urllib.parse
+from os import walk
 
 
-async def get_tiktok(video_id: int) -> Optional["TikTokData"]:
-    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(5)) as session:
-        async with session.get(
-            f"https://api2.musical.ly/aweme/v1/aweme/detail/?aweme_id={video_id}",
-            allow_redirects=False,
-        ) as response:
-            data = await response.json()
-            if data.get("aweme_detail") and data.get("status_code") == 0:
-                return TikTokData.from_dict(data["aweme_detail"])
-            raise ValueError("Unable to get TikTok data")
+TIKTOK_CACHE = TTLCache(maxsize=2048, ttl=60 * 60)
+"""aweme_id -> TikTokData, the video, author and music don't change"""
+STATISTICS_TTL = 60
+"""Seconds cached Statistics are shown for, they change all the time"""
+TIKTOK_FLIGHT = SingleFlight(prioritized=True)
+
+
+async def get_tiktok(video_id: int, statistics: bool = False) -> Optional["TikTokData"]:
+    """
+    Gets the TikTok data, from the cache when possible.
+
+    args:
+        video_id: The aweme id.
+        statistics: If the caller shows the statistics, which expire sooner.
+
+    returns:
+        The TikTok data.
+    """
+    video_id = int(video_id)
+    if tiktok := TIKTOK_CACHE.get(video_id, STATISTICS_TTL if statistics else None):
+        return tiktok
+    return await TIKTOK_FLIGHT.do(video_id, _fetch_tiktok, video_id)
+
+
+PARSE_EXECUTOR: Optional[Executor] = None
+"""Parses TikTokData off the event loop when set, see `parse_tiktoks`"""
+
+
+async def parse_tiktoks(datas: List[dict]) -> List["TikTokData"]:
+    """
+    Parses aweme_details, in the PARSE_EXECUTOR if there is one so large
+    batches don't block the gateway.
+
+    args:
+        datas: The aweme_details.
+
+    returns:
+        The TikTok data.
+    """
+    if PARSE_EXECUTOR is None:
+        return TikTokData.from_list(datas)
+    return await asyncio.get_running_loop().run_in_executor(
+        PARSE_EXECUTOR, TikTokData.from_list, datas
+    )
+
+
+async def _fetch_tiktok(video_id: int) -> "TikTokData":
+    async with request(
+        "GET",
+        f"https://api2.musical.ly/aweme/v1/aweme/detail/?aweme_id={video_id}",
+        allow_redirects=False,
+        timeout=aiohttp.ClientTimeout(5),
+    ) as response:
+        data = await read_json(
+            response, {"status_code": None, "aweme_detail": AWEME_DETAIL_FIELDS}
+        )
+        if data.get("aweme_detail") and data.get("status_code") == 0:
+            tiktok = (await parse_tiktoks([data["aweme_detail"]]))[0]
+            TIKTOK_CACHE.set(video_id, tiktok)
+            return tiktok
+        raise ValueError("Unable to get TikTok data")
+
+
+RENDER_DATA_REGEX = re.compile(
+    r'<script id="RENDER_DATA" type="application/json">(?P<data>[^<]*)</script>'
+)
+
+
+async def get_douyin_data(url: str) -> dict:
+    """
+    Gets the RENDER_DATA of a Douyin video page.
+
+    args:
+        url: The url of the video.
+
+    returns:
+        The decoded RENDER_DATA.
+    """
+    try:
+        return await _fetch_douyin_data(url)
+    except Shed:  # the browser is the most expensive way, don't add load
+        raise
+    except Exception as e:
+        print(f"Note: falling back to the browser for {url}: {e}")
+
+    async with PAGES.page() as page:
+        await page.goto(url)
+        element = await page.querySelector("#RENDER_DATA")
+        render_data = await page.evaluate("(element) => element.innerText", element)
+    return loads(urllib.parse.unquote(render_data))
+
+
+async def _fetch_douyin_data(url: str) -> dict:
+    async with request("GET", url, headers={"User-Agent": USER_AGENT}) as response:
+        html = await response.text()
+    if not (match := RENDER_DATA_REGEX.search(html)):
+        raise ValueError("No RENDER_DATA in the page")
+    return loads(urllib.parse.unquote(match.group("data")))
 
 
 async def get_music_data(music_id: int = None) -> Optional[dict]:
@@ -30,21 +129,26 @@ async def get_music_data(music_id: int = None) -> Optional[dict]:
     returns:
         The music data.
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.get(
-            f"https://tiktok.com/api/music/detail/?language=en&musicId={music_id}",
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:97.0) Gecko/20100101 Firefox/97.0"
-            },
-        ) as response:
-            if response.status == 200:
-                if data := await response.json():
-                    if data.get("statusCode") == 10218:
-                        return None
-                    return data
-                return data
-            else:
+    async with request(
+        "GET",
+        f"https://tiktok.com/api/music/detail/?language=en&musicId={music_id}",
+        headers={
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:97.0) Gecko/20100101 Firefox/97.0"
+        },
+    ) as response:
+        if response.status == 200:
+            try:
+                data = await read_json(response)
+            except ValueError as e:  # not json, there is no extra data then
+                print(f"Note: unable to decode the music data of {music_id}: {e}")
                 return None
+            if data:
+                if data.get("statusCode") == 10218:
+                    return None
+                return data
+            return data
+        else:
+            return None
 
 
 def get_scales(path: str) -> list:
@@ -54,6 +158,11 @@ def get_scales(path: str) -> list:
     return ["tiktoker.scales.{}".format(x) for x in scales]
 
 
+GUILD_CONFIGS: Dict[int, "Config"] = {}
+"""guild_id -> Config, every config write goes through here"""
+CONFIG_FLIGHT = SingleFlight()
+
+
 async def get_guild_config(guild_id: int) -> "Config":
     """
     Gets the guild config.
@@ -64,26 +173,101 @@ async def get_guild_config(guild_id: int) -> "Config":
     returns:
         The guild config.
     """
-    if config := await Config.find_one({"guild_id": guild_id}):
+    if config := GUILD_CONFIGS.get(guild_id):
         return config
-    else:
-        new_config = Config(guild_id=guild_id)
-        await new_config.save()
-        return new_config
+    return await CONFIG_FLIGHT.do(guild_id, _load_guild_config, guild_id)
+
+
+@requires_db
+async def _load_guild_config(guild_id: int) -> "Config":
+    if not (config := await Config.find_one({"guild_id": guild_id})):
+        config = Config(guild_id=guild_id)
+        await config.save()
+    GUILD_CONFIGS[guild_id] = config
+    return config
 
 
 async def edit_guild_config(guild_id: int, **kwargs) -> "Config":
+    """
+    Edits the guild config, in one write.
+
+    args:
+        guild_id: The guild id.
+        **kwargs: The config fields to change.
+
+    returns:
+        The guild config.
+    """
     config = await get_guild_config(guild_id)
-    for key, value in kwargs.items():
-        await config.update({key: value})
-    return await get_guild_config(guild_id)
+    if kwargs:
+        await config.set(kwargs)
+        for key, value in kwargs.items():  # keep the cached copy in sync
+            setattr(config, key, value)
+    return config
+
+
+def forget_guild_config(guild_id: int) -> None:
+    """
+    Drops the cached guild config, e.g. when the bot leaves the guild.
+
+    args:
+        guild_id: The guild id.
+    """
+    GUILD_CONFIGS.pop(guild_id, None)
+
+
+BACKGROUND_TASKS: Set[asyncio.Task] = set()
+"""Work started off the response path, referenced until it's done so it
+isn't garbage collected, and waited for on shutdown"""
+
+
+def run_in_background(awaitable: Awaitable[Any]) -> asyncio.Task:
+    """
+    Runs work off the response path.
+
+    args:
+        awaitable: The work.
+
+    returns:
+        The task running it.
+    """
+    task = asyncio.ensure_future(awaitable)
+    BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_background_task_done)
+    return task
 
 
+def _background_task_done(task: asyncio.Task) -> None:
+    BACKGROUND_TASKS.discard(task)
+    if not task.cancelled() and (e := task.exception()):
+        print(f"Error: background task failed: {e!r}")
+
+
+async def drain_background_tasks(timeout: float = 10) -> None:
+    """
+    Waits for the background tasks, cancelling the ones still running after
+    `timeout` seconds.
+
+    args:
+        timeout: The seconds to wait.
+    """
+    if BACKGROUND_TASKS:
+        _, pending = await asyncio.wait(set(BACKGROUND_TASKS), timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+
+USAGE_WRITER = UsageWriter()
+USAGE_STATS = UsageStats()
+STATS_FLIGHT = SingleFlight()
+
+
+@requires_db
 async def insert_usage_data(
     guild_id: int, user_id: int, video_id: int, message_id: int
 ) -> None:
     """
-    Inserts usage data.
+    Queues usage data to be inserted by the USAGE_WRITER.
 
     args:
         guild_id: The guild id.
@@ -96,11 +280,18 @@ async def insert_usage_data(
         user_id = None
         message_id = None
 
-    await UsageData(
-        guild_id=guild_id, user_id=user_id, video_id=video_id, message_id=message_id
-    ).save()
+    usage_data = UsageData(
+        guild_id=guild_id,
+        user_id=user_id,
+        video_id=video_id,
+        message_id=message_id,
+        entry_time=datetime.utcnow(),  # not when it gets written
+    )
+    USAGE_STATS.record(usage_data)
+    USAGE_WRITER.put(usage_data)
 
 
+@requires_db
 async def get_guild_usage_data(guild_id: int) -> List["UsageData"]:
     """
     Gets the guild usage data.
@@ -114,6 +305,7 @@ async def get_guild_usage_data(guild_id: int) -> List["UsageData"]:
     return await UsageData.find({"guild_id": guild_id}).to_list()
 
 
+@requires_db
 async def get_user_usage_data(user_id: int) -> List["UsageData"]:
     """
     Gets the user usage data.
@@ -127,6 +319,20 @@ async def get_user_usage_data(user_id: int) -> List["UsageData"]:
     return await UsageData.find({"user_id": user_id}).to_list()
 
 
+@requires_db
+async def get_usage_stats() -> "UsageStats":
+    """
+    Gets the usage statistics, loading them on first use.
+
+    returns:
+        The usage statistics.
+    """
+    if not USAGE_STATS.loaded:
+        await STATS_FLIGHT.do(None, USAGE_STATS.load)
+    return USAGE_STATS
+
+
+@requires_db
 async def get_all_usage_data() -> List["UsageData"]:
     """
     Gets all usage data.
@@ -137,24 +343,80 @@ async def get_all_usage_data() -> List["UsageData"]:
     return await UsageData.find_all().to_list()
 
 
+OPTED_OUT: Optional[Set[int]] = None
+"""user ids that opted out, kept in sync with the OptedOut collection"""
+OPTED_OUT_FLIGHT = SingleFlight()
+
+
+@requires_db
+async def load_opted_out() -> Set[int]:
+    """
+    Loads every opted out user id into OPTED_OUT.
+
+    returns:
+        The opted out user ids.
+    """
+    global OPTED_OUT
+    OPTED_OUT = {
+        opted_out.user_id for opted_out in await OptedOut.find_all().to_list()
+    }
+    return OPTED_OUT
+
+
+@requires_db
 async def add_opted_out(user_id: int) -> None:
+    if await get_opted_out(user_id):
+        return
     await OptedOut(user_id=user_id).save()
+    OPTED_OUT.add(user_id)
 
 
+@requires_db
 async def remove_opted_out(user_id: int) -> None:
     await OptedOut.find_one({"user_id": user_id}).delete()
+    if OPTED_OUT is not None:
+        OPTED_OUT.discard(user_id)
 
 
+@requires_db
 async def remove_usage_data(guild_id: int, user_id: int) -> None:
     usage_data = UsageData.find({"guild_id": guild_id, "user_id": user_id})
     await usage_data.update_many().set({"message_id": None, "user_id": None})
 
 
 async def get_opted_out(user_id: int) -> bool:
-    if opted_out := await OptedOut.find_one({"user_id": user_id}):
-        return True
-    else:
-        return False
+    if OPTED_OUT is None:
+        await OPTED_OUT_FLIGHT.do(None, load_opted_out)
+    return user_id in OPTED_OUT
+
+
+LINK_PATTERNS = {
+    VideoIdType.LONG: r"(?P<LONG_http>http:|https:\/\/)?(www\.)?tiktok\.com\/(@.{1,24})\/video\/(?P<LONG_id>\d{15,30})",
+    VideoIdType.SHORT: r"(?P<SHORT_http>http:|https:\/\/)?((?!ww)\w{2})\.tiktok.com\/(?P<SHORT_id>\w{5,15})",
+    VideoIdType.MEDIUM: r"(?P<MEDIUM_http>http:|https:\/\/)?m\.tiktok\.com\/v\/(?P<MEDIUM_id>\d{15,30})",
+    VideoIdType.FYP: r"(?P<FYP_http>http:|https:\/\/)?(www)?\.tiktok.com\/(.*)item_id=(?P<FYP_id>\d{5,30})",
+    VideoIdType.DOUYIN_LONG: r"(?P<DOUYIN_LONG_http>http:|https:\/\/)?(www\.)?douyin\.com\/video\/(?P<DOUYIN_LONG_id>\d{15,30})",
+    VideoIdType.DOUYIN_SHORT: r"(?P<DOUYIN_SHORT_http>http:|https:\/\/)?((?!ww)\w{1,2})\.douyin.com\/(?P<DOUYIN_SHORT_id>\w{5,15})",
+}
+"""Link patterns in order of priority, when a message matches more than one."""
+
+LINK_REGEX = re.compile(
+    "|".join(
+        f"(?P<{video_id_type.name}>{pattern})"
+        for video_id_type, pattern in LINK_PATTERNS.items()
+    )
+)
+
+
+def _link_from_match(match: re.Match) -> "LinkData":
+    """Builds a LinkData from a LINK_REGEX match."""
+    name = match.lastgroup
+    url = match.group(name)
+    if not match.group(f"{name}_http"):
+        url = f"https://{url}"
+    return LinkData.from_list(
+        [VideoIdType[name], match.group(f"{name}_id"), url, name.startswith("DOUYIN")]
+    )
 
 
 def check_for_link(content: str) -> Optional["LinkData"]:
@@ -167,119 +429,56 @@ def check_for_link(content: str) -> Optional["LinkData"]:
     returns:
         LinkData
     """
-    try:
-        fyp_match = re.search(
-            r"(?P<http>http:|https:\/\/)?(www)?\.tiktok.com\/(.*)item_id=(?P<item_id>\d{5,30})",
-            content,
-        )
-        long_match = re.search(
-            r"(?P<http>http:|https:\/\/)?(www\.)?tiktok\.com\/(@.{1,24})\/video\/(?P<id>\d{15,30})",
-            content,
-        )
-        short_match = re.search(
-            r"(?P<http>http:|https:\/\/)?((?!ww)\w{2})\.tiktok.com\/(?P<short_id>\w{5,15})",
-            content,
-        )
-        medium_match = re.search(
-            r"(?P<http>http:|https:\/\/)?m\.tiktok\.com\/v\/(?P<id>\d{15,30})", content
-        )
-        douyin_long_match = re.search(
-            r"(?P<http>http:|https:\/\/)?(www\.)?douyin\.com\/video\/(?P<id>\d{15,30})",
-            content,
-        )
-        douyin_short_match = re.search(
-            r"(?P<http>http:|https:\/\/)?((?!ww)\w{1,2})\.douyin.com\/(?P<short_id>\w{5,15})",
-            content,
-        )
+    if not content:
+        return None
+    # Every pattern has "tiktok" or "douyin" at most 12 characters
+    # ("https://www.") after it starts, so most messages stop here.
+    starts = [i for i in (content.find("tiktok"), content.find("douyin")) if i != -1]
+    if not starts:
+        return None
+
+    best = None
+    pos = max(min(starts) - 12, 0)
+    while match := LINK_REGEX.search(content, pos):
+        if best is None or (
+            VideoIdType[match.lastgroup].value < VideoIdType[best.lastgroup].value
+        ):
+            best = match
+            if VideoIdType[best.lastgroup] is VideoIdType.LONG:
+                break
+        # matches of other types may overlap this one, keep scanning from
+        # the next character so priorities are the same as checking each
+        # pattern on its own
+        pos = match.start() + 1
+
+    if best is None:
+        return None
+    return _link_from_match(best)
+
+
+def find_all_links(content: str) -> List["LinkData"]:
+    """
+    Finds every TikTok/Douyin link in the content.
+
+    args:
+        content: The content to check.
+
+    returns:
+        The links in the order they appear, without duplicates.
+    """
+    links = []
+    if not content or ("tiktok" not in content and "douyin" not in content):
+        return links
+
+    seen = set()
+    for word in content.split():
+        if (link := check_for_link(word)) and (link.type, link.id) not in seen:
+            seen.add((link.type, link.id))
+            links.append(link)
+    return links
 
-    except TypeError as e:
-        print(f"{content} is not a string")
-        print(type(content))
-    if long_match:
-        if not long_match.group("http"):
-            return LinkData.from_list(
-                [
-                    VideoIdType.LONG,
-                    long_match.group("id"),
-                    f"https://{long_match.group(0)}",
-                ]
-            )
-        return LinkData.from_list(
-            [VideoIdType.LONG, long_match.group("id"), long_match.group(0)]
-        )
-    if short_match:
-        if not short_match.group("http"):
-            return LinkData.from_list(
-                [
-                    VideoIdType.SHORT,
-                    short_match.group("short_id"),
-                    f"https://{short_match.group(0)}",
-                ]
-            )
-        return LinkData.from_list(
-            [VideoIdType.SHORT, short_match.group("short_id"), short_match.group(0)]
-        )
-    if medium_match:
-        if not medium_match.group("http"):
-            return LinkData.from_list(
-                [
-                    VideoIdType.MEDIUM,
-                    medium_match.group("id"),
-                    f"https://{medium_match.group(0)}",
-                ]
-            )
-        return LinkData.from_list(
-            [VideoIdType.MEDIUM, medium_match.group("id"), medium_match.group(0)]
-        )
-    if fyp_match:
-        if not fyp_match.group("http"):
-            return LinkData.from_list(
-                [
-                    VideoIdType.FYP,
-                    fyp_match.group("item_id"),
-                    f"https://{fyp_match.group(0)}",
-                ]
-            )
-        return LinkData.from_list(
-            [VideoIdType.FYP, fyp_match.group("item_id"), fyp_match.group(0)]
-        )
-    if douyin_long_match:
-        if not douyin_long_match.group("http"):
-            return LinkData.from_list(
-                [
-                    VideoIdType.DOUYIN_LONG,
-                    douyin_long_match.group("id"),
-                    f"https://{douyin_long_match.group(0)}",
-                    True,
-                ]
-            )
-        return LinkData.from_list(
-            [
-                VideoIdType.DOUYIN_LONG,
-                douyin_long_match.group("id"),
-                douyin_long_match.group(0),
-                True,
-            ]
-        )
-    if douyin_short_match:
-        if not douyin_short_match.group("http"):
-            return LinkData.from_list(
-                [
-                    VideoIdType.DOUYIN_SHORT,
-                    douyin_short_match.group("short_id"),
-                    f"https://{douyin_short_match.group(0)}",
-                    True,
-                ]
-            )
-        return LinkData.from_list(
-            [
-                VideoIdType.DOUYIN_SHORT,
-                douyin_short_match.group("short_id"),
-                douyin_short_match.group(0),
-                True,
-            ]
-        )
-    return None
+
+SHORT_URLS = ShortUrls()
 
 
 async def create_short_url(video_uri: str, douyin: bool = False) -> str:
@@ -288,47 +487,77 @@ async def create_short_url(video_uri: str, douyin: bool = False) -> str:
 
     args:
         video_uri: The uri of the video.
+        douyin: If the video is a Douyin video.
 
     returns:
         The shortened url.
     """
+    return await SHORT_URLS.get(video_uri, douyin)
 
-    if existing_entry := await Shortener.find_one({"video_uri": video_uri}):
-
-        return existing_entry.shortened_url
 
-    slug = urlsafe_b64encode(urandom(6)).decode()
-    while await Shortener.find_one({"slug": slug}) != None:
-        print("Note: slug collision, regenerating")
-        slug = urlsafe_b64encode(urandom(6)).decode()
-
-    shortener = Shortener(
-        video_uri=video_uri,
-        slug=slug,
-        shortened_url=f"https://m.tiktoker.win/{slug}",
-        douyin=douyin,
-    )
-    try:
-        await shortener.save()
-    except DuplicateKeyError:
-        # NOTE: This can be triggered when someone spams the link
-        #       so we just ignore it and return the existing url.
-        ...
-    return shortener.shortened_url
+SHORT_LINKS = TTLCache(maxsize=10000, ttl=24 * 60 * 60)
+"""(douyin, short id) -> video id, backed by the ShortLink collection"""
+VIDEO_ID_FLIGHT = SingleFlight(prioritized=True)
+VIDEO_PATH_REGEX = re.compile(r"/video/(?P<id>\d{15,30})")
 
 
-async def get_video_id(url: str) -> int:
+async def get_video_id(link: "LinkData") -> Optional[int]:
     """
-    Gets the video id from short url.
+    Gets the video id of a short link.
+
+    A short id always points at the same video, so it is only resolved over
+    http once and then kept in memory and in the database.
 
     args:
-        url: The url to get the id from.
+        link: The TikTok or Douyin short link.
 
     returns:
-        The video id.
+        The video id, None if the link doesn't redirect to a video.
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, allow_redirects=False) as response:
-            if location := response.headers.get("Location"):
-                if link := check_for_link(location):
-                    return link.id
+    key = (link.douyin, link.id)
+    if video_id := SHORT_LINKS.get(key):
+        return video_id
+    return await VIDEO_ID_FLIGHT.do(key, _resolve_short_link, link)
+
+
+async def _resolve_short_link(link: "LinkData") -> Optional[int]:
+    key = (link.douyin, link.id)
+    if short_link := await _find_short_link(link):
+        SHORT_LINKS.set(key, short_link.video_id)
+        return short_link.video_id
+
+    if video_id := await _fetch_video_id(link.url):
+        SHORT_LINKS.set(key, video_id)
+        await _save_short_link(link, video_id)
+    return video_id
+
+
+@requires_db
+async def _find_short_link(link: "LinkData") -> Optional["ShortLink"]:
+    return await ShortLink.find_one({"short_id": link.id, "douyin": link.douyin})
+
+
+@requires_db
+async def _save_short_link(link: "LinkData", video_id: int) -> None:
+    try:
+        await ShortLink.get_motor_collection().update_one(
+            {"short_id": link.id, "douyin": link.douyin},
+            {"$setOnInsert": {"video_id": video_id}},
+            upsert=True,
+        )
+    except Exception as e:  # it gets resolved over http again next time
+        print(f"Error: unable to save short link {link.id}: {e}")
+
+
+async def _fetch_video_id(url: str) -> Optional[int]:
+    async with request("GET", url, allow_redirects=False) as response:
+        location = response.headers.get("Location")
+    if not location:
+        return None
+    if link := check_for_link(location):
+        if link.type not in (VideoIdType.SHORT, VideoIdType.DOUYIN_SHORT):
+            return int(link.id)
+    # Douyin redirects to iesdouyin.com/share/video/<id>/
+    if match := VIDEO_PATH_REGEX.search(location):
+        return int(match.group("id"))
+    return None
@@ -0,0 +1,139 @@
+"""usage analytics, counted by mongo instead of in python"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+import attr
+from attr import define
+from tiktoker.db.models import UsageData
+from tiktoker.db import requires_db
+
+
+@define
+class UsageSummary:
+    """
+    A summary of usage data.
+    """
+
+    total: int = attr.ib()
+    unique_users: int = attr.ib()
+    daily: List[Tuple[str, int]] = attr.ib()
+    """ (YYYY-MM-DD, conversions), oldest first """
+    top_videos: List[Tuple[int, int]] = attr.ib()
+    """ (video_id, conversions), most converted first """
+
+
+@requires_db
+async def summarize_usage(
+    match: Dict[str, Any], days: int = 30, top: int = 5
+) -> "UsageSummary":
+    """
+    Summarizes the matching usage data in one aggregation.
+
+    args:
+        match: The filter, e.g. {"guild_id": guild_id}.
+        days: The number of days of daily counts.
+        top: The number of top videos.
+
+    returns:
+        The usage summary.
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    result = await UsageData.aggregate(
+        [
+            {"$match": match},
+            {"$project": {"_id": 0, "user_id": 1, "video_id": 1, "entry_time": 1}},
+            {
+                "$facet": {
+                    "total": [{"$count": "count"}],
+                    "unique_users": [
+                        {"$match": {"user_id": {"$ne": None}}},
+                        {"$group": {"_id": "$user_id"}},
+                        {"$count": "count"},
+                    ],
+                    "daily": [
+                        {"$match": {"entry_time": {"$gte": since}}},
+                        {
+                            "$group": {
+                                "_id": {
+                                    "$dateToString": {
+                                        "format": "%Y-%m-%d",
+                                        "date": "$entry_time",
+                                    }
+                                },
+                                "count": {"$sum": 1},
+                            }
+                        },
+                        {"$sort": {"_id": 1}},
+                    ],
+                    "top_videos": [
+                        {"$group": {"_id": "$video_id", "count": {"$sum": 1}}},
+                        {"$sort": {"count": -1}},
+                        {"$limit": top},
+                    ],
+                }
+            },
+        ]
+    ).to_list()
+    facets = result[0]
+
+    return UsageSummary(
+        total=facets["total"][0]["count"] if facets["total"] else 0,
+        unique_users=(
+            facets["unique_users"][0]["count"] if facets["unique_users"] else 0
+        ),
+        daily=[(day["_id"], day["count"]) for day in facets["daily"]],
+        top_videos=[(video["_id"], video["count"]) for video in facets["top_videos"]],
+    )
+
+
+async def get_guild_usage_summary(
+    guild_id: int, days: int = 30, top: int = 5
+) -> "UsageSummary":
+    """
+    Summarizes the guild usage data.
+
+    args:
+        guild_id: The guild id.
+        days: The number of days of daily counts.
+        top: The number of top videos.
+
+    returns:
+        The guild usage summary.
+    """
+    return await summarize_usage({"guild_id": guild_id}, days, top)
+
+
+async def get_user_usage_summary(
+    user_id: int, days: int = 30, top: int = 5
+) -> "UsageSummary":
+    """
+    Summarizes the user usage data.
+
+    args:
+        user_id: The user id.
+        days: The number of days of daily counts.
+        top: The number of top videos.
+
+    returns:
+        The user usage summary.
+    """
+    return await summarize_usage({"user_id": user_id}, days, top)
+
+
+@requires_db
+async def count_guild_usage(guild_id: int, since: datetime = None) -> int:
+    """
+    Counts the guild conversions, without loading them.
+
+    args:
+        guild_id: The guild id.
+        since: Only count conversions after this time.
+
+    returns:
+        The number of conversions.
+    """
+    match = {"guild_id": guild_id}
+    if since:
+        match["entry_time"] = {"$gte": since}
+    return await UsageData.find(match).count()
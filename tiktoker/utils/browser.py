@@ -0,0 +1,148 @@
+"""headless browser page pool"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import AsyncIterator, List, Optional, Tuple
+from pyppeteer import launch
+from pyppeteer.browser import Browser
+from pyppeteer.page import Page
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/61.0.3163.100 Safari/537.36"
+BLOCKED_RESOURCES = {"image", "font", "media", "stylesheet"}
+
+
+class PagePool:
+    """
+    A pool of warm browser pages sharing one browser.
+
+    Pages come with the user agent set and images, fonts, media and styles
+    blocked. They are reused until they have loaded `max_uses` pages, and the
+    browser is relaunched if it crashes.
+
+    The browser is only launched when a page is first needed (or `start` is
+    called), and closed again once no page was used for `idle_timeout`.
+
+    args:
+        size: The max number of pages in use at once.
+        max_uses: The number of uses after which a page is replaced.
+        idle_timeout: Seconds without use before the browser is closed, None to keep it.
+    """
+
+    def __init__(
+        self, size: int = 4, max_uses: int = 50, idle_timeout: Optional[float] = 300
+    ):
+        self.size = size
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self.crashes = 0
+        self.browser: Optional[Browser] = None
+        self._idle: List[Tuple[Page, int]] = []
+        self._in_use = 0
+        self._last_used = monotonic()
+        self._slots = asyncio.Semaphore(size)
+        self._launching = asyncio.Lock()
+        self._idle_watcher: Optional[asyncio.Task] = None
+
+    async def start(self) -> "Browser":
+        """
+        Launches the browser, unless it is already running.
+
+        returns:
+            The browser.
+        """
+        async with self._launching:
+            if self.browser is None:
+                self.browser = await launch(headless=True)
+                self.browser.on("disconnected", self._on_disconnected)
+                self._last_used = monotonic()
+                if self.idle_timeout and (
+                    self._idle_watcher is None or self._idle_watcher.done()
+                ):
+                    self._idle_watcher = asyncio.create_task(self._close_when_idle())
+        return self.browser
+
+    async def close(self) -> None:
+        """Closes every page and the browser."""
+        if self._idle_watcher is not None:
+            self._idle_watcher.cancel()
+            self._idle_watcher = None
+        async with self._launching:
+            await self._close_browser()
+
+    async def _close_browser(self) -> None:
+        browser, self.browser = self.browser, None
+        self._idle.clear()
+        if browser is not None:
+            browser.remove_listener("disconnected", self._on_disconnected)
+            await browser.close()
+
+    async def _close_when_idle(self) -> None:
+        while self.browser is not None:
+            await asyncio.sleep(self.idle_timeout / 2)
+            async with self._launching:
+                if not self._in_use and (
+                    monotonic() - self._last_used > self.idle_timeout
+                ):
+                    print("Note: closing the idle browser")
+                    await self._close_browser()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator["Page"]:
+        """
+        Borrows a page, waiting for one to be free if `size` are in use.
+
+        yields:
+            The page.
+        """
+        async with self._slots:
+            self._in_use += 1
+            try:
+                page, uses = await self._acquire()
+                try:
+                    yield page
+                except Exception:
+                    await self._discard(page)  # it may be left in a broken state
+                    raise
+                if uses + 1 >= self.max_uses or self.browser is None:
+                    await self._discard(page)
+                else:
+                    self._idle.append((page, uses + 1))
+            finally:
+                self._in_use -= 1
+                self._last_used = monotonic()
+
+    async def _acquire(self) -> Tuple["Page", int]:
+        while self._idle:
+            page, uses = self._idle.pop()
+            if not page.isClosed():
+                return page, uses
+
+        browser = await self.start()
+        page = await browser.newPage()
+        await page.setUserAgent(USER_AGENT)
+        await page.setRequestInterception(True)
+        page.on("request", _intercept)
+        return page, 0
+
+    async def _discard(self, page: "Page") -> None:
+        try:
+            await page.close()
+        except Exception:  # the browser is gone already
+            pass
+
+    def _on_disconnected(self) -> None:
+        print("Note: browser disconnected, it will be relaunched on next use")
+        self.crashes += 1
+        self.browser = None
+        self._idle.clear()
+
+
+def _intercept(request) -> None:
+    if request.resourceType in BLOCKED_RESOURCES:
+        asyncio.ensure_future(request.abort())
+    else:
+        asyncio.ensure_future(request.continue_())
+
+
+PAGES = PagePool()
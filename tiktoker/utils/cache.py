@@ -0,0 +1,100 @@
+"""in-memory caches"""
+
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    A size bounded LRU cache whose entries expire.
+
+    args:
+        maxsize: The max number of entries, the least recently used is evicted past it.
+        ttl: The number of seconds an entry is valid for.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, ttl: Optional[float] = None) -> Optional[Any]:
+        """
+        Gets an entry.
+
+        args:
+            key: The key of the entry.
+            ttl: Overrides the cache ttl for this lookup, e.g. for data that goes stale sooner.
+
+        returns:
+            The value, or None if missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, stored_at = entry
+        age = monotonic() - stored_at
+        if age > (self.ttl if ttl is None else ttl):
+            if age > self.ttl:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Sets an entry.
+
+        args:
+            key: The key of the entry.
+            value: The value of the entry.
+        """
+        self._entries[key] = (value, monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """
+        Removes an entry.
+
+        args:
+            key: The key of the entry.
+
+        returns:
+            The removed value, if there was one.
+        """
+        if entry := self._entries.pop(key, None):
+            return entry[0]
+        return None
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Gets the cache counters.
+
+        returns:
+            The size, hits, misses and evictions.
+        """
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
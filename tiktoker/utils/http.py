@@ -0,0 +1,139 @@
+"""shared http client"""
+
+import json
+import urllib.parse
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+import aiohttp
+from tiktoker.utils import scheduler
+
+try:
+    import orjson
+
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+"""The json decoder, orjson when it is installed"""
+
+
+SESSION: Optional[aiohttp.ClientSession] = None
+
+
+async def init(
+    timeout: float = 10, limit: int = 100, limit_per_host: int = 20
+) -> aiohttp.ClientSession:
+    """
+    Creates the session every outbound request goes through.
+
+    args:
+        timeout: The default total timeout of a request, in seconds.
+        limit: The max number of open connections.
+        limit_per_host: The max number of open connections to one host.
+
+    returns:
+        The session.
+    """
+    global SESSION
+    await close()
+    SESSION = _create_session(timeout, limit, limit_per_host)
+    return SESSION
+
+
+def _create_session(
+    timeout: float = 10, limit: int = 100, limit_per_host: int = 20
+) -> aiohttp.ClientSession:
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            ttl_dns_cache=300,
+            keepalive_timeout=30,
+        ),
+        timeout=aiohttp.ClientTimeout(timeout),
+        cookie_jar=aiohttp.DummyCookieJar(),  # every request starts clean
+    )
+
+
+@asynccontextmanager
+async def request(
+    method: str, url: str, **kwargs
+) -> AsyncIterator[aiohttp.ClientResponse]:
+    """
+    Makes a request with the shared session once its host's turn comes, see
+    `scheduler.SCHEDULER`. The request timeout starts after the wait.
+
+    args:
+        method: The http method.
+        url: The url.
+        **kwargs: The kwargs of `aiohttp.ClientSession.request`.
+
+    yields:
+        The response.
+
+    raises:
+        scheduler.Shed: When the request is dropped instead.
+    """
+    await scheduler.SCHEDULER.acquire(urllib.parse.urlsplit(url).hostname)
+    async with get_session().request(method, url, **kwargs) as response:
+        yield response
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Gets the shared session, creating it with defaults if `init` was not called.
+
+    returns:
+        The session.
+    """
+    global SESSION
+    if SESSION is None or SESSION.closed:
+        SESSION = _create_session()
+    return SESSION
+
+
+async def close() -> None:
+    """Closes the shared session."""
+    global SESSION
+    if SESSION is not None and not SESSION.closed:
+        await SESSION.close()
+    SESSION = None
+
+
+async def read_json(response: aiohttp.ClientResponse, fields: dict = None) -> Any:
+    """
+    Decodes a json response with the fastest decoder available.
+
+    args:
+        response: The response.
+        fields: Only keep these fields of the decoded object, see `select_fields`.
+
+    returns:
+        The decoded json, None for an empty body (like `response.json()`).
+    """
+    if not (body := (await response.read()).strip()):
+        return None
+    data = loads(body)
+    if fields is not None:
+        return select_fields(data, fields)
+    return data
+
+
+def select_fields(data: Any, fields: Dict[str, Optional[dict]]) -> Any:
+    """
+    Drops everything but the given fields, so large unused subtrees aren't
+    kept around (or pickled, or cached).
+
+    args:
+        data: The decoded json.
+        fields: field -> None to keep it whole, or the fields to keep of it.
+
+    returns:
+        The selected fields.
+    """
+    if not isinstance(data, dict):
+        return data
+    return {
+        key: value if fields[key] is None else select_fields(value, fields[key])
+        for key, value in data.items()
+        if key in fields
+    }
@@ -0,0 +1,53 @@
+"""periodic counters, so cache and coalescing savings show up in the logs"""
+
+import asyncio
+from typing import Any, Dict
+import tiktoker.utils as utils
+from tiktoker.utils import redirect, shards
+from tiktoker.utils.browser import PAGES
+from tiktoker.utils.scheduler import SCHEDULER
+
+LOG_INTERVAL = 15 * 60
+"""Seconds between stats log lines"""
+
+
+def collect_stats() -> Dict[str, Any]:
+    """
+    Gets the counters of every cache, coalescer, writer and limiter.
+
+    returns:
+        name -> its counters.
+    """
+    return {
+        "tiktok_cache": utils.TIKTOK_CACHE.stats(),
+        "tiktok_flight": utils.TIKTOK_FLIGHT.stats(),
+        "video_id_cache": utils.SHORT_LINKS.stats(),
+        "video_id_flight": utils.VIDEO_ID_FLIGHT.stats(),
+        "config_flight": utils.CONFIG_FLIGHT.stats(),
+        "short_urls": utils.SHORT_URLS.stats(),
+        "usage_writer": utils.USAGE_WRITER.stats(),
+        "redirect": redirect.stats(),
+        "browser_crashes": PAGES.crashes,
+        "upstream": SCHEDULER.stats(),
+    }
+
+
+def log_stats() -> None:
+    """Prints the counters, one line each."""
+    for name, stats in collect_stats().items():
+        print(f"Stats: shard {shards.SHARD_ID} {name} {stats}")
+
+
+async def log_stats_periodically(interval: float = LOG_INTERVAL) -> None:
+    """
+    Logs the counters every `interval` seconds.
+
+    args:
+        interval: The seconds between logs.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            log_stats()
+        except Exception as e:
+            print(f"Error: unable to log stats: {e}")
@@ -0,0 +1,120 @@
+"""redirects short url slugs to the video"""
+
+import re
+import socket
+from typing import Dict, Optional
+from aiohttp import web
+from tiktoker.db.models import Shortener
+from tiktoker.db import requires_db
+from tiktoker.utils.cache import TTLCache
+from tiktoker.utils.singleflight import SingleFlight
+
+TIKTOK_PLAY_URL = (
+    "https://api16-normal-c-useast1a.tiktokv.com/aweme/v1/play/?video_id={}"
+)
+DOUYIN_PLAY_URL = (
+    "https://aweme.snssdk.com/aweme/v1/play/?video_id={}&ratio=720p&line=0"
+)
+SLUG_REGEX = re.compile(r"[A-Za-z0-9_-]{8}")
+
+LOCATIONS = TTLCache(maxsize=50000, ttl=24 * 60 * 60)
+"""slug -> play url, a slug always points at the same video"""
+LOCATION_FLIGHT = SingleFlight()
+
+RUNNER: Optional[web.AppRunner] = None
+
+
+def get_location(video_uri: str, douyin: bool = False) -> str:
+    """
+    Builds the play url of a video.
+
+    args:
+        video_uri: The uri of the video.
+        douyin: If the video is a Douyin video.
+
+    returns:
+        The play url.
+    """
+    return (DOUYIN_PLAY_URL if douyin else TIKTOK_PLAY_URL).format(video_uri)
+
+
+@requires_db
+async def _load_location(slug: str) -> Optional[str]:
+    entry = await Shortener.get_motor_collection().find_one(
+        {"slug": slug}, {"_id": 0, "video_uri": 1, "douyin": 1}
+    )
+    if entry is None:
+        return None
+    location = get_location(entry["video_uri"], entry.get("douyin") or False)
+    LOCATIONS.set(slug, location)
+    return location
+
+
+async def redirect(request: web.Request) -> web.Response:
+    """Redirects a slug to the video, 404 if there is no such slug."""
+    slug = request.match_info["slug"]
+    if not (location := LOCATIONS.get(slug)):
+        if not SLUG_REGEX.fullmatch(slug):
+            return web.Response(status=404)
+        if not (location := await LOCATION_FLIGHT.do(slug, _load_location, slug)):
+            return web.Response(status=404)
+    return web.Response(status=302, headers={"Location": location})
+
+
+def create_app() -> web.Application:
+    """
+    Creates the redirect app.
+
+    returns:
+        The app.
+    """
+    app = web.Application()
+    app.router.add_get("/{slug}", redirect)
+    return app
+
+
+async def start(host: str = "0.0.0.0", port: int = 8080) -> web.AppRunner:
+    """
+    Serves redirects on the running event loop, next to the bot or on its own.
+
+    Where the platform supports SO_REUSEPORT (not Windows) the port is bound
+    with it, so every shard process can serve it.
+
+    args:
+        host: The host to listen on.
+        port: The port to listen on.
+
+    returns:
+        The runner.
+    """
+    global RUNNER
+    await stop()
+    RUNNER = web.AppRunner(create_app(), access_log=None)
+    await RUNNER.setup()
+    await web.TCPSite(
+        RUNNER, host, port, reuse_port=hasattr(socket, "SO_REUSEPORT")
+    ).start()
+    return RUNNER
+
+
+async def stop() -> None:
+    """Stops serving redirects."""
+    global RUNNER
+    if RUNNER is not None:
+        await RUNNER.cleanup()
+        RUNNER = None
+
+
+def stats() -> Dict[str, int]:
+    """
+    Gets the redirect counters.
+
+    returns:
+        The cached slugs, cache hits and misses, and lookups made.
+    """
+    return {
+        "cached": len(LOCATIONS),
+        "hits": LOCATIONS.hits,
+        "misses": LOCATIONS.misses,
+        "lookups": LOCATION_FLIGHT.calls,
+    }
@@ -0,0 +1,212 @@
+"""upstream request scheduling"""
+
+import asyncio
+from contextvars import ContextVar
+from enum import IntEnum
+from heapq import heapify, heappop, heappush
+from itertools import count
+from time import monotonic
+from typing import Dict, List, Optional, Tuple
+
+
+class Priority(IntEnum):
+    """Lower goes first."""
+
+    COMMAND = 0  # slash commands and context menus
+    BUTTON = 1
+    AUTO_EMBED = 2
+    BACKGROUND = 3  # prefetching, anything not started by a user
+
+
+PRIORITY: ContextVar[Priority] = ContextVar("PRIORITY", default=Priority.BACKGROUND)
+"""The priority of the upstream requests made by the current task."""
+
+
+class Shed(Exception):
+    """Raised when a request is dropped, because its host's queue is full or
+    it waited too long."""
+
+
+class HostLimiter:
+    """
+    A token bucket for one host, with the requests waiting for a token
+    queued by priority.
+
+    args:
+        rate: The tokens added per second.
+        burst: The max number of tokens, the requests that can go at once.
+        max_queue: The max number of waiting requests, the lowest priority is shed past it.
+        max_wait: The max seconds a request waits, it is shed after that.
+    """
+
+    def __init__(self, rate: float, burst: int, max_queue: int, max_wait: float):
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.tokens = float(burst)
+        self.granted = 0
+        self.shed = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._updated = monotonic()
+        self._waiting: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queued(self) -> int:
+        """The number of requests waiting for a token."""
+        return sum(not future.done() for _, _, future in self._waiting)
+
+    async def acquire(self, priority: int) -> None:
+        """
+        Waits for a token.
+
+        args:
+            priority: The priority of the request.
+
+        raises:
+            Shed: When the queue is full of requests of the same or higher
+                priority, or no token came within `max_wait`.
+        """
+        self._refill()
+        if not self._waiting and self.tokens >= 1:
+            self.tokens -= 1
+            self.granted += 1
+            return
+
+        if len(self._waiting) >= self.max_queue:
+            self._waiting = [entry for entry in self._waiting if not entry[2].done()]
+            heapify(self._waiting)
+        if len(self._waiting) >= self.max_queue:
+            lowest = max(self._waiting)
+            if lowest[0] <= priority:
+                self.shed += 1
+                raise Shed("Too many requests waiting")
+            self._waiting.remove(lowest)
+            heapify(self._waiting)
+            self.shed += 1
+            lowest[2].set_exception(Shed("Shed for a higher priority request"))
+
+        future = asyncio.get_running_loop().create_future()
+        heappush(self._waiting, (priority, next(self._order), future))
+        self._grant()
+        started = monotonic()
+        try:
+            # cancels the future on timeout, it is skipped when tokens come
+            await asyncio.wait_for(future, self.max_wait)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            self.timeouts += 1
+            raise Shed(f"No turn within {self.max_wait}s") from None
+        waited = monotonic() - started
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _release(self) -> None:
+        self._timer = None
+        self._grant()
+
+    def _grant(self) -> None:
+        self._refill()
+        while self._waiting and self.tokens >= 1:
+            _, _, future = heappop(self._waiting)
+            if future.done():  # the request was cancelled
+                continue
+            self.tokens -= 1
+            self.granted += 1
+            future.set_result(None)
+
+        if self._waiting and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                (1 - self.tokens) / self.rate, self._release
+            )
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Gets the limiter counters.
+
+        returns:
+            The requests waiting, granted, shed and shed for waiting too long,
+            and the total and max seconds waited.
+        """
+        return {
+            "queued": self.queued,
+            "granted": self.granted,
+            "shed": self.shed,
+            "timeouts": self.timeouts,
+            "wait_total": self.wait_total,
+            "wait_max": self.wait_max,
+        }
+
+
+class Scheduler:
+    """
+    Rate limits upstream requests per host, so bursts of auto embeds don't
+    get us rate limited and don't hold up the users running commands.
+
+    args:
+        rate: The requests per second to one host.
+        burst: The requests that can go at once to an idle host.
+        max_queue: The max number of requests waiting for one host.
+        max_wait: The max seconds a request waits for its turn.
+        limits: host -> (rate, burst), for hosts with their own limits.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10,
+        burst: int = 20,
+        max_queue: int = 200,
+        max_wait: float = 5,
+        limits: Dict[str, Tuple[float, int]] = None,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.limits = limits or {}
+        self.hosts: Dict[str, HostLimiter] = {}
+
+    async def acquire(self, host: str, priority: Optional[int] = None) -> None:
+        """
+        Waits until a request to the host may go.
+
+        args:
+            host: The host of the request.
+            priority: The priority of the request, the task's PRIORITY by default.
+
+        raises:
+            Shed: When the request is dropped.
+        """
+        if (limiter := self.hosts.get(host)) is None:
+            rate, burst = self.limits.get(host, (self.rate, self.burst))
+            limiter = self.hosts[host] = HostLimiter(
+                rate, burst, self.max_queue, self.max_wait
+            )
+        await limiter.acquire(PRIORITY.get() if priority is None else priority)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Gets the counters of every host.
+
+        returns:
+            host -> the limiter counters.
+        """
+        return {host: limiter.stats() for host, limiter in self.hosts.items()}
+
+
+SCHEDULER = Scheduler(
+    limits={
+        "api2.musical.ly": (10, 20),
+        "tiktok.com": (5, 10),
+        "www.douyin.com": (5, 10),
+    }
+)
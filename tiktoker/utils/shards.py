@@ -0,0 +1,91 @@
+"""gateway sharding across processes"""
+
+import asyncio
+from datetime import datetime, timedelta
+from os import environ
+from dotenv import get_key
+import dis_snek as dis
+from tiktoker.db import requires_db
+from tiktoker.db.models import ShardStatus
+from tiktoker.utils import USAGE_STATS, load_opted_out
+
+
+def get_setting(key: str) -> str:
+    """Get a setting, the environment overrides .env"""
+    return environ.get(key) or get_key(".env", key)
+
+
+TOTAL_SHARDS = int(get_setting("TOTAL_SHARDS") or 1)
+SHARD_ID = int(get_setting("SHARD_ID") or 0)
+"""The shard of this process, set for each process by run.py"""
+REPORT_INTERVAL = 60
+"""Seconds between reports of this shard's guild count"""
+STATS_REFRESH_INTERVAL = 15 * 60
+"""Seconds between refreshes of the usage stats other shards also record,
+shard 0 adds the usage data saved since and saves a snapshot that the other
+shards load"""
+
+
+@requires_db
+async def report_guild_count(bot: dis.Snake) -> None:
+    """
+    Saves the guild count of this shard.
+
+    args:
+        bot: The bot.
+    """
+    await ShardStatus.find_one({"shard_id": SHARD_ID}).upsert(
+        {"$set": {"guild_count": len(bot.guilds), "updated_at": datetime.utcnow()}},
+        on_insert=ShardStatus(shard_id=SHARD_ID, guild_count=len(bot.guilds)),
+    )
+
+
+@requires_db
+async def get_total_guild_count(bot: dis.Snake) -> int:
+    """
+    Gets the guild count of every shard that reported recently.
+
+    args:
+        bot: The bot.
+
+    returns:
+        The guild count.
+    """
+    if TOTAL_SHARDS == 1:
+        return len(bot.guilds)
+
+    since = datetime.utcnow() - timedelta(seconds=REPORT_INTERVAL * 3)
+    counts = {
+        status.shard_id: status.guild_count
+        for status in await ShardStatus.find({"updated_at": {"$gte": since}}).to_list()
+    }
+    counts[SHARD_ID] = len(bot.guilds)  # this one is always up to date
+    return sum(counts.values())
+
+
+async def coordinate(bot: dis.Snake) -> None:
+    """
+    Keeps the shards of other processes informed, and this process
+    informed of what changed in other processes.
+
+    args:
+        bot: The bot.
+    """
+    if TOTAL_SHARDS == 1:
+        return
+
+    since_stats = 0
+    while True:
+        try:
+            await report_guild_count(bot)
+            if since_stats:
+                await load_opted_out()  # users can opt out from any shard
+            if since_stats >= STATS_REFRESH_INTERVAL:
+                since_stats = 0
+                await USAGE_STATS.refresh()
+            if since_stats == 0 and SHARD_ID == 0 and USAGE_STATS.loaded:
+                await USAGE_STATS.save_snapshot()
+        except Exception as e:
+            print(f"Error: shard coordination failed: {e}")
+        await asyncio.sleep(REPORT_INTERVAL)
+        since_stats += REPORT_INTERVAL
@@ -0,0 +1,108 @@
+"""short urls for videos"""
+
+from base64 import urlsafe_b64encode
+from hashlib import blake2b
+from typing import Dict
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from tiktoker.db.models import Shortener
+from tiktoker.db import requires_db
+from tiktoker.utils.cache import TTLCache
+from tiktoker.utils.singleflight import SingleFlight
+
+SHORT_URL_BASE = "https://m.tiktoker.win/"
+MAX_SLUG_ATTEMPTS = 8
+
+
+def make_slug(video_uri: str, attempt: int = 0) -> str:
+    """
+    Derives the slug of a video uri.
+
+    The same uri always gets the same slug, when it is taken by another uri
+    the next attempt derives a different one.
+
+    args:
+        video_uri: The uri of the video.
+        attempt: The number of slugs that collided before.
+
+    returns:
+        The 8 character slug.
+    """
+    digest = blake2b(f"{attempt}:{video_uri}".encode(), digest_size=6).digest()
+    return urlsafe_b64encode(digest).decode()
+
+
+class ShortUrls:
+    """
+    Shortens video uris, keeping the recently shortened ones in memory.
+
+    A miss costs one upsert, which either returns the existing short url or
+    creates it. Concurrent calls for the same uri share that upsert.
+
+    args:
+        maxsize: The max number of uris kept in memory.
+        ttl: The number of seconds a uri is kept in memory.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 24 * 60 * 60):
+        self.index = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.collisions = 0
+        self._flight = SingleFlight()
+
+    async def get(self, video_uri: str, douyin: bool = False) -> str:
+        """
+        Gets the short url of a video uri, creating it if needed.
+
+        args:
+            video_uri: The uri of the video.
+            douyin: If the video is a Douyin video.
+
+        returns:
+            The short url.
+        """
+        if short_url := self.index.get(video_uri):
+            return short_url
+        return await self._flight.do(video_uri, self._upsert, video_uri, douyin)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Gets the shortener counters.
+
+        returns:
+            The uris in memory, index hits and misses, and slug collisions.
+        """
+        return {
+            "indexed": len(self.index),
+            "hits": self.index.hits,
+            "misses": self.index.misses,
+            "collisions": self.collisions,
+        }
+
+    @requires_db
+    async def _upsert(self, video_uri: str, douyin: bool) -> str:
+        collection = Shortener.get_motor_collection()
+        for attempt in range(MAX_SLUG_ATTEMPTS):
+            slug = make_slug(video_uri, attempt)
+            try:
+                entry = await collection.find_one_and_update(
+                    {"video_uri": video_uri},
+                    {
+                        "$setOnInsert": {
+                            "slug": slug,
+                            "shortened_url": SHORT_URL_BASE + slug,
+                            "douyin": douyin,
+                        }
+                    },
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+            except DuplicateKeyError:
+                # either the slug is taken by another uri, or another process
+                # inserted this uri first, the next attempt finds out which
+                self.collisions += 1
+                continue
+
+            self.index.set(video_uri, entry["shortened_url"])
+            return entry["shortened_url"]
+
+        raise RuntimeError(f"Unable to find a free slug for {video_uri}")
@@ -0,0 +1,79 @@
+"""request coalescing"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+from tiktoker.utils.scheduler import PRIORITY, Priority
+
+
+class SingleFlight:
+    """
+    Makes concurrent calls for the same key share one in-flight call.
+
+    When a link goes viral the same video gets requested by many messages at
+    once, every caller after the first awaits the first one's result instead.
+
+    args:
+        prioritized: For calls that make upstream requests. The call runs with
+            the first caller's upstream PRIORITY, so a caller with a higher
+            priority doesn't join it (and wait, or get shed, with it) but makes
+            its own call, which later callers join instead. Not for calls that
+            must only run once at a time, e.g. ones that create a document.
+    """
+
+    def __init__(self, prioritized: bool = False):
+        self.prioritized = prioritized
+        self.calls = 0
+        self.coalesced = 0
+        self.overtaken = 0
+        self._in_flight: Dict[Hashable, Tuple[int, asyncio.Future]] = {}
+
+    async def do(
+        self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Any:
+        """
+        Calls `func`, unless a call for `key` is already running.
+
+        args:
+            key: What identifies the call, e.g. the video id.
+            func: The coroutine function to call.
+            *args: The args to call it with.
+            **kwargs: The kwargs to call it with.
+
+        returns:
+            The result of the (shared) call.
+        """
+        priority = PRIORITY.get() if self.prioritized else Priority.COMMAND
+        in_flight = self._in_flight.get(key)
+        if in_flight and in_flight[0] <= priority:
+            future = in_flight[1]
+            self.coalesced += 1
+        else:
+            if in_flight:
+                self.overtaken += 1
+            self.calls += 1
+            future = asyncio.ensure_future(func(*args, **kwargs))
+            self._in_flight[key] = (priority, future)
+            future.add_done_callback(lambda _: self._forget(key, future))
+
+        # shielded so one caller timing out doesn't cancel it for the others
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Gets the coalescing counters.
+
+        returns:
+            The upstream calls made, calls coalesced, calls made instead of
+            joining a lower priority one, and calls in flight.
+        """
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "overtaken": self.overtaken,
+            "in_flight": len(self._in_flight),
+        }
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        # unless a higher priority call for the key replaced it
+        if (in_flight := self._in_flight.get(key)) and in_flight[1] is future:
+            del self._in_flight[key]
@@ -0,0 +1,53 @@
+"""startup orchestration"""
+
+import asyncio
+from time import perf_counter
+from typing import Any, Awaitable, Dict
+
+
+class Startup:
+    """
+    Runs startup stages, concurrently where they don't depend on each
+    other, and records how long each one took.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._started = perf_counter()
+
+    async def stage(self, name: str, awaitable: Awaitable[Any]) -> Any:
+        """
+        Runs a stage.
+
+        args:
+            name: The name of the stage.
+            awaitable: The work of the stage.
+
+        returns:
+            The result of the stage.
+        """
+        started = perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.timings[name] = perf_counter() - started
+            print(f"Startup: {name} took {self.timings[name]:.2f}s")
+
+    async def gather(self, **stages: Awaitable[Any]) -> list:
+        """
+        Runs stages concurrently.
+
+        args:
+            **stages: The work of each stage, by name.
+
+        returns:
+            The results of the stages.
+        """
+        return await asyncio.gather(
+            *[self.stage(name, awaitable) for name, awaitable in stages.items()]
+        )
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since startup began."""
+        return perf_counter() - self._started
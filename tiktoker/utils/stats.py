@@ -0,0 +1,350 @@
+"""incrementally maintained usage statistics"""
+
+from datetime import datetime, timedelta
+from hashlib import blake2b
+from math import log
+from typing import Dict, Hashable, List, Optional, Tuple
+from tiktoker.db.models import UsageData, UsageSnapshot
+
+WRITE_DELAY = timedelta(minutes=1)
+"""newer usage data may not be written yet, the next refresh adds it"""
+
+
+class HyperLogLog:
+    """
+    Estimates the number of distinct values added, in constant memory.
+
+    args:
+        precision: 2**precision registers are used, the error is about 1.04 / sqrt(2**precision).
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: Hashable) -> None:
+        """
+        Adds a value.
+
+        args:
+            value: The value, hashed by its str.
+        """
+        hashed = int.from_bytes(
+            blake2b(str(value).encode(), digest_size=8).digest(), "big"
+        )
+        bits = 64 - self.precision
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def __len__(self) -> int:
+        size = len(self.registers)
+        estimate = (
+            0.7213
+            / (1 + 1.079 / size)
+            * size**2
+            / sum(2.0**-register for register in self.registers)
+        )
+        if estimate <= 2.5 * size and (zeros := self.registers.count(0)):
+            estimate = size * log(size / zeros)  # linear counting for small sets
+        return round(estimate)
+
+
+class TopK:
+    """
+    Keeps the approximate k most common values (Space-Saving algorithm).
+
+    args:
+        k: The number of values tracked.
+    """
+
+    def __init__(self, k: int = 100):
+        self.k = k
+        self.counts: Dict[Hashable, int] = {}
+
+    def add(self, value: Hashable, count: int = 1) -> None:
+        """
+        Counts a value.
+
+        args:
+            value: The value.
+            count: How many times to count it.
+        """
+        if value in self.counts or len(self.counts) < self.k:
+            self.counts[value] = self.counts.get(value, 0) + count
+            return
+        # replace the least common value, inheriting its count as the error
+        least = min(self.counts, key=self.counts.get)
+        self.counts[value] = self.counts.pop(least) + count
+
+    def most_common(self, n: int = 1) -> List[Tuple[Hashable, int]]:
+        """
+        Gets the most common values.
+
+        args:
+            n: The number of values.
+
+        returns:
+            The values and their counts, most common first.
+        """
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+class UsageStats:
+    """
+    Usage statistics, updated as usage data is recorded so /info never
+    reads the whole UsageData collection.
+
+    With more than one shard, only shard 0 loads them from UsageData, once,
+    and then only adds what the other shards saved since (`incremental`). It
+    saves its statistics as a UsageSnapshot, which the other shards load
+    instead (`from_snapshot`).
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self.from_snapshot = False
+        self.incremental = False
+        self.counted_until: Optional[datetime] = None
+        """the usage data up to here is counted, newer is only what was recorded"""
+        self.total = 0
+        self.hourly: Dict[datetime, int] = {}
+        """start of the hour -> conversions, for the last 24 hours"""
+        self.users = HyperLogLog()
+        self.videos = TopK()
+        self._recorded_while_loading: Optional[List["UsageData"]] = None
+        self._recorded: List[Tuple[datetime, int]] = []
+        """(entry_time, video_id) recorded since counted_until, when incremental"""
+
+    def record(self, usage_data: "UsageData") -> None:
+        """
+        Counts usage data.
+
+        args:
+            usage_data: The usage data.
+        """
+        if self._recorded_while_loading is not None:
+            self._recorded_while_loading.append(usage_data)
+        if self.incremental:
+            self._recorded.append((usage_data.entry_time, usage_data.video_id))
+        self.total += 1
+        hour = usage_data.entry_time.replace(minute=0, second=0, microsecond=0)
+        self.hourly[hour] = self.hourly.get(hour, 0) + 1
+        if usage_data.user_id:
+            self.users.add(usage_data.user_id)
+        self.videos.add(usage_data.video_id)
+
+    @property
+    def today(self) -> int:
+        """The conversions in the last 24 hours."""
+        since = datetime.utcnow() - timedelta(days=1)
+        for hour in [hour for hour in self.hourly if hour < since - timedelta(hours=1)]:
+            del self.hourly[hour]
+        return sum(count for hour, count in self.hourly.items() if hour >= since)
+
+    @property
+    def unique_users(self) -> int:
+        """The approximate number of distinct users."""
+        return len(self.users)
+
+    @property
+    def most_popular_video_id(self) -> Optional[int]:
+        """The most converted video."""
+        if most_common := self.videos.most_common(1):
+            return most_common[0][0]
+        return None
+
+    async def load(self) -> None:
+        """
+        Reloads the statistics, from the snapshot if `from_snapshot`,
+        otherwise counted by Mongo.
+
+        Without a snapshot (shard 0 hasn't saved one yet) only what this
+        process recorded is counted until the next load.
+
+        The statistics are only replaced once everything is loaded, so they
+        can be read while loading.
+        """
+        self._recorded_while_loading = []
+        try:
+            if self.from_snapshot:
+                await self._load_snapshot()
+            else:
+                await self._load_usage_data()
+        finally:
+            self._recorded_while_loading = None
+        self.loaded = True
+
+    async def refresh(self) -> None:
+        """
+        Catches up with the usage other processes recorded: adds the usage
+        data saved since `counted_until` when `incremental`, otherwise loads
+        the statistics.
+        """
+        if self.incremental and self.counted_until is not None:
+            await self._load_new_usage_data()
+        else:
+            await self.load()
+
+    def _swap(
+        self,
+        total: int,
+        hourly: Dict[datetime, int],
+        users: "HyperLogLog",
+        videos: "TopK",
+    ) -> None:
+        # usage recorded while loading may not have been written yet, count
+        # it again (what was written already is counted twice, rarely)
+        recorded = self._recorded_while_loading or []
+        self.total, self.hourly, self.users, self.videos = total, hourly, users, videos
+        self._recorded_while_loading = None
+        self._recorded = []
+        for usage_data in recorded:
+            self.record(usage_data)
+
+    async def _load_usage_data(self) -> None:
+        counted_until = datetime.utcnow()
+        total = await UsageData.find_all().count()
+
+        since = datetime.utcnow() - timedelta(days=1)
+        hourly = {}
+        async for bucket in UsageData.aggregate(
+            [
+                {"$match": {"entry_time": {"$gte": since}}},
+                {
+                    "$group": {
+                        "_id": {
+                            "$dateToString": {
+                                "format": "%Y-%m-%dT%H",
+                                "date": "$entry_time",
+                            }
+                        },
+                        "count": {"$sum": 1},
+                    }
+                },
+            ]
+        ):
+            hour = datetime.strptime(bucket["_id"], "%Y-%m-%dT%H")
+            hourly[hour] = bucket["count"]
+
+        users = HyperLogLog()
+        async for user in UsageData.aggregate(
+            [
+                {"$match": {"user_id": {"$ne": None}}},
+                {"$group": {"_id": "$user_id"}},
+            ]
+        ):
+            users.add(user["_id"])
+
+        videos = TopK()
+        async for video in UsageData.aggregate(
+            [
+                {"$group": {"_id": "$video_id", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1}},
+                {"$limit": videos.k},
+            ]
+        ):
+            videos.add(video["_id"], video["count"])
+
+        self._swap(total, hourly, users, videos)
+        self.counted_until = counted_until
+
+    async def _load_new_usage_data(self) -> None:
+        since, until = self.counted_until, datetime.utcnow() - WRITE_DELAY
+        if until <= since:
+            return
+        match = {"$match": {"entry_time": {"$gt": since, "$lte": until}}}
+
+        # (hour, video_id) -> conversions saved by every process, less the
+        # ones this process recorded already
+        new: Dict[Tuple[datetime, int], int] = {}
+        async for bucket in UsageData.aggregate(
+            [
+                match,
+                {
+                    "$group": {
+                        "_id": {
+                            "hour": {
+                                "$dateToString": {
+                                    "format": "%Y-%m-%dT%H",
+                                    "date": "$entry_time",
+                                }
+                            },
+                            "video_id": "$video_id",
+                        },
+                        "count": {"$sum": 1},
+                    }
+                },
+            ]
+        ):
+            hour = datetime.strptime(bucket["_id"]["hour"], "%Y-%m-%dT%H")
+            new[hour, bucket["_id"]["video_id"]] = bucket["count"]
+
+        user_ids = [
+            user["_id"]
+            async for user in UsageData.aggregate(
+                [
+                    match,
+                    {"$match": {"user_id": {"$ne": None}}},
+                    {"$group": {"_id": "$user_id"}},
+                ]
+            )
+        ]
+
+        # usage recorded while this ran is newer than `until`
+        recorded = [entry for entry in self._recorded if entry[0] <= until]
+        self._recorded = [entry for entry in self._recorded if entry[0] > until]
+        for entry_time, video_id in recorded:
+            key = (entry_time.replace(minute=0, second=0, microsecond=0), video_id)
+            new[key] = new.get(key, 0) - 1
+
+        for (hour, video_id), count in new.items():
+            if count <= 0:  # recorded here but not written in time
+                continue
+            self.total += count
+            self.hourly[hour] = self.hourly.get(hour, 0) + count
+            self.videos.add(video_id, count)
+        for user_id in user_ids:  # adding a user again changes nothing
+            self.users.add(user_id)
+        self.counted_until = until
+
+    async def _load_snapshot(self) -> bool:
+        if not (snapshot := await UsageSnapshot.find_one({})):
+            return False
+
+        users = HyperLogLog()
+        if len(snapshot.users) == len(users.registers):
+            users.registers = bytearray(snapshot.users)
+        videos = TopK()
+        for video_id, count in snapshot.videos:
+            videos.add(video_id, count)
+        self._swap(
+            snapshot.total,
+            {
+                datetime.strptime(hour, "%Y-%m-%dT%H"): count
+                for hour, count in snapshot.hourly.items()
+            },
+            users,
+            videos,
+        )
+        return True
+
+    async def save_snapshot(self) -> None:
+        """Saves the statistics for the other shards to load."""
+        fields = {
+            "total": self.total,
+            "hourly": {
+                hour.strftime("%Y-%m-%dT%H"): count
+                for hour, count in self.hourly.items()
+            },
+            "users": bytes(self.users.registers),
+            "videos": [
+                [video_id, count]
+                for video_id, count in self.videos.most_common(self.videos.k)
+            ],
+            "updated_at": datetime.utcnow(),
+        }
+        await UsageSnapshot.find_one({}).upsert(
+            {"$set": fields}, on_insert=UsageSnapshot(**fields)
+        )
@@ -1,41 +1,82 @@
 import gettext
-from os import walk, system, getcwd
+from os import walk, path
 import re
+from typing import Dict
 from iso639 import languages
+from tiktoker.utils import msgfmt
 
 # python .\utils\pygettext.py -d bot -o .\locale\en\LC_MESSAGES\bot.po .\bot.py
 # example how to make po file
 
 regex = r"Language-Team: (.*)"
-_languages = [dir for dir in walk("./tiktoker/locale")][0][1]
+LOCALE_DIR = "./tiktoker/locale"
+_languages = [dir for dir in walk(LOCALE_DIR)][0][1]
 language_names = {}
 
 for lang in _languages:
     language_names[lang] = languages.get(alpha2=lang).name
 
+DEFAULT_LANGUAGE = "en"
+
+
+class CachedTranslation:
+    """A translation that looks every message up once"""
+
+    def __init__(self, translation: gettext.NullTranslations):
+        self.translation = translation
+        self._messages: Dict[str, str] = {}
+
+    def gettext(self, message: str) -> str:
+        try:
+            return self._messages[message]
+        except KeyError:
+            translated = self._messages[message] = self.translation.gettext(message)
+            return translated
+
+
+class Translations(dict):
+    """language -> CachedTranslation, unknown languages get the default one"""
+
+    def __missing__(self, lang: str) -> "CachedTranslation":
+        if lang != DEFAULT_LANGUAGE and DEFAULT_LANGUAGE in self:
+            return self[DEFAULT_LANGUAGE]
+        return CachedTranslation(gettext.NullTranslations())
+
+
+TRANSLATIONS: Dict[str, "Translations"] = {}
+"""domain -> language -> translation, every scale loads through here"""
+
+
+def compile_catalog(file: str, lang: str) -> None:
+    """Compile a .po file into its .mo file, unless the .mo file is up to date"""
+    po_file = f"{LOCALE_DIR}/{lang}/LC_MESSAGES/{file}.po"
+    mo_file = f"{LOCALE_DIR}/{lang}/LC_MESSAGES/{file}.mo"
+    if not path.exists(po_file):
+        return
+    if path.exists(mo_file) and path.getmtime(mo_file) >= path.getmtime(po_file):
+        return
+
+    print("Compiling {} for {}".format(file, lang))
+    msgfmt.MESSAGES.clear()  # msgfmt keeps the messages of the last file around
+    try:
+        msgfmt.make(po_file, mo_file)
+    except SystemExit:  # msgfmt exits on a broken .po file
+        print("Unable to compile {} for {}".format(file, lang))
+
 
 def load_lang(file: str):
     """Load a language file"""
+    if file in TRANSLATIONS:
+        return TRANSLATIONS[file]
+
     for x in _languages:
-        cwd = getcwd().replace("\\", "/")  # windows lol
-        print("Loading {} for {}".format(file, x))
-        system(
-            "python "
-            + cwd
-            + "/tiktoker/utils/msgfmt.py "
-            + cwd
-            + "/tiktoker/locale/"
-            + x
-            + f"/LC_MESSAGES/{file}.po"
-        )
+        compile_catalog(file, x)
 
     initilized_langs = {}
 
     for x in _languages:
         try:
-            initilized_langs[x] = gettext.translation(
-                file, "./tiktoker/locale", languages=[x]
-            )
+            initilized_langs[x] = gettext.translation(file, LOCALE_DIR, languages=[x])
         except FileNotFoundError:
             continue
 
@@ -45,4 +86,33 @@ def load_lang(file: str):
         except KeyError:
             continue
 
-    return initilized_langs
+    TRANSLATIONS[file] = Translations(
+        {lang: CachedTranslation(x) for lang, x in initilized_langs.items()}
+    )
+    return TRANSLATIONS[file]
+
+
+def get_domains() -> list:
+    """Get the names of every .po file"""
+    return sorted(
+        {
+            file[:-3]
+            for _, _, files in walk(LOCALE_DIR)
+            for file in files
+            if file.endswith(".po")
+        }
+    )
+
+
+def load_all() -> None:
+    """Load every language file, so scales don't have to when they load"""
+    for domain in get_domains():
+        load_lang(domain)
+
+
+if __name__ == "__main__":
+    # Compiles every catalog ahead of time, e.g. when building an image
+    # Should be ran from the root of the project
+    for domain in get_domains():
+        for x in _languages:
+            compile_catalog(domain, x)
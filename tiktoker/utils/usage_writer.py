@@ -0,0 +1,106 @@
+"""buffered usage data writes"""
+
+import asyncio
+from typing import Dict, List, Optional
+from tiktoker.db.models import UsageData
+from tiktoker.db import requires_db
+
+
+class UsageWriter:
+    """
+    Buffers usage data and writes it in batches, off the response path.
+
+    The queue is bounded, when the database can't keep up new entries are
+    dropped (and counted) instead of slowing down message handling.
+
+    args:
+        max_queue: The max number of entries waiting to be written.
+        batch_size: Writes once this many entries are waiting.
+        flush_interval: Or once the oldest waiting entry is this many seconds old.
+    """
+
+    def __init__(
+        self, max_queue: int = 10000, batch_size: int = 500, flush_interval: float = 5
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self._task: Optional[asyncio.Task] = None
+
+    def put(self, usage_data: "UsageData") -> bool:
+        """
+        Queues usage data to be written.
+
+        args:
+            usage_data: The usage data.
+
+        returns:
+            If it was queued, False if it was dropped.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            self._queue.put_nowait(usage_data)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    async def close(self) -> None:
+        """Writes everything still queued and stops the writer."""
+        if self._task is None or self._task.done():
+            return
+        await self._queue.put(None)  # everything before it gets written first
+        await self._task
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Gets the writer counters.
+
+        returns:
+            The entries queued, written, dropped and failed to write.
+        """
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if (usage_data := await self._queue.get()) is None:
+                return
+
+            batch = [usage_data]
+            deadline = loop.time() + self.flush_interval
+            closing = False
+            while len(batch) < self.batch_size:
+                try:
+                    usage_data = await asyncio.wait_for(
+                        self._queue.get(), deadline - loop.time()
+                    )
+                except asyncio.TimeoutError:
+                    break
+                if usage_data is None:
+                    closing = True
+                    break
+                batch.append(usage_data)
+
+            await self._write(batch)
+            if closing:
+                return
+
+    @requires_db
+    async def _write(self, batch: List["UsageData"]) -> None:
+        try:
+            await UsageData.insert_many(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"Error: unable to write {len(batch)} usage data entries: {e}")
+        else:
+            self.written += len(batch)